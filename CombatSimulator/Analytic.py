@@ -0,0 +1,114 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from CombatSimulator.Fighters import FighterStats, MAX_TURNS, character_hits, monster_hits
+
+
+@dataclass(frozen=True)
+class StrikeSeries:
+    """What ``s`` strikes do to one side of the fight, for s = 0..attacks.
+
+    kill[s]      P(the s-th strike is the killing one)
+    survive[s]   P(still alive after s strikes)
+    alive_hp[s]  E[remaining hp, counted only while alive after s strikes]
+    killed_hp[s] E[remaining (zero or negative) hp, counted only if killed by strike s]
+    """
+    kill: np.ndarray
+    survive: np.ndarray
+    alive_hp: np.ndarray
+    killed_hp: np.ndarray
+
+
+def _strike_distribution(hits: tuple[tuple[int, float], ...]) -> dict[int, float]:
+    distribution = {0: 1.0}
+    for damage, block_chance in hits:
+        combined = {}
+        for dealt, probability in distribution.items():
+            combined[dealt + damage] = combined.get(dealt + damage, 0) + probability * (1 - block_chance)
+            combined[dealt] = combined.get(dealt, 0) + probability * block_chance
+        distribution = {dealt: p for dealt, p in combined.items() if p > 0}
+    return distribution
+
+
+@lru_cache(maxsize=65536)
+def strike_series(hits: tuple[tuple[int, float], ...], hp: int, attacks: int) -> StrikeSeries:
+    kill = np.zeros(attacks + 1)
+    survive = np.zeros(attacks + 1)
+    alive_hp = np.zeros(attacks + 1)
+    killed_hp = np.zeros(attacks + 1)
+    survive[0], alive_hp[0] = 1.0, hp
+
+    if all(block_chance == 0 for _, block_chance in hits):
+        # deterministic strikes, closed form
+        per_strike = sum(damage for damage, _ in hits)
+        lethal = math.ceil(hp / per_strike) if per_strike else attacks + 1
+        for s in range(1, attacks + 1):
+            if s < lethal:
+                survive[s], alive_hp[s] = 1.0, hp - s * per_strike
+            elif s == lethal:
+                kill[s], killed_hp[s] = 1.0, hp - s * per_strike
+        return StrikeSeries(kill, survive, alive_hp, killed_hp)
+
+    outcomes = list(_strike_distribution(hits).items())
+    widest = max(dealt for dealt, _ in outcomes)
+    remaining = hp - np.arange(hp + widest)
+    alive = np.zeros(hp)
+    alive[0] = 1.0
+    for s in range(1, attacks + 1):
+        taken = np.zeros(hp + widest)
+        for dealt, probability in outcomes:
+            taken[dealt:dealt + hp] += alive * probability
+        alive, dead = taken[:hp], taken[hp:]
+        kill[s] = dead.sum()
+        killed_hp[s] = dead @ remaining[hp:]
+        survive[s] = alive.sum()
+        alive_hp[s] = alive @ remaining[:hp]
+        if survive[s] < 1e-15:
+            break
+    return StrikeSeries(kill, survive, alive_hp, killed_hp)
+
+
+@lru_cache(maxsize=262144)
+def solve(character: FighterStats, monster: FighterStats, max_turns: int = MAX_TURNS) -> dict:
+    """Exact outcome of a fight, with the same turn order and limit as the Monte Carlo engine.
+
+    The character's k-th strike lands on half-turn 2k-1 and the monster's j-th on 2j, so
+    the character wins on strike k if the monster dies to it and the character survived
+    the monster's first k-1 strikes. Both strike series are independent of each other.
+    """
+    attacks = (max_turns + 1) // 2
+    dealt = strike_series(tuple(character_hits(character, monster)), monster.hp, attacks)
+    taken = strike_series(tuple(monster_hits(monster, character)), character.hp, attacks)
+
+    win = dealt.kill[1:] * taken.survive[:-1]
+    loss = taken.kill[1:] * dealt.survive[1:]
+    timeout = dealt.survive[-1] * taken.survive[-1]
+    strikes = np.arange(1, attacks + 1)
+
+    win_probability = float(win.sum())
+    avg_turns = float(win @ (2 * strikes) + loss @ (2 * strikes + 1) + timeout * (2 * attacks + 1))
+    character_hp = float(
+        dealt.kill[1:] @ taken.alive_hp[:-1] + taken.killed_hp[1:] @ dealt.survive[1:]
+        + dealt.survive[-1] * taken.alive_hp[-1]
+    )
+    monster_hp = float(
+        dealt.killed_hp[1:] @ taken.survive[:-1] + taken.kill[1:] @ dealt.alive_hp[1:]
+        + taken.survive[-1] * dealt.alive_hp[-1]
+    )
+    return {
+        "all_wins": win_probability > 1 - 1e-9,
+        "any_wins": win_probability > 1e-9,
+        "avg_turns": avg_turns,
+        "character_hp": character_hp,
+        "monster_hp": monster_hp,
+        "win_probability": win_probability,
+        "loss_probability": float(loss.sum()),
+        "timeout_probability": float(timeout)
+    }
+
+
+def win_probability(character: FighterStats, monster: FighterStats) -> float:
+    return solve(character, monster)["win_probability"]
@@ -1,17 +1,26 @@
 import math
 import random
 
+from CombatSimulator import Analytic, MonteCarlo
+from CombatSimulator.Fighters import FighterStats
+from CombatSimulator.Loadout import Loadout, LoadoutSearch, collect_candidates
+from CombatSimulator.Workers import CombatWorkerPool
 from api.ArtifactsAPI import ArtifactsAPI
 from character.Character import Character, ElementalStat, Equipment
 from character.item.Item import parse_item
 
 
 class CombatSimulator:
-    def __init__(self, character: str | Character, monster: str | dict):
+    ENGINES = ("monte_carlo", "analytic", "python")
+    # exact and cached, so scoring every candidate item stays cheap
+    SCREENING_ENGINE = "analytic"
+
+    def __init__(self, character: str | Character, monster: str | dict, engine="monte_carlo"):
         self.client: ArtifactsAPI = ArtifactsAPI.instance()
         self.character: 'Character' = Character(character) if isinstance(character, str) else character
         self.monster = self.client.get_monster_by_code(monster) if isinstance(monster, str) else monster
         self.virtual_character = None
+        self.engine = engine
 
     def get_monster_elemental_attacks(self):
         return ElementalStat(
@@ -31,9 +40,27 @@ class CombatSimulator:
             air=self.monster.get('res_air', 0)
         )
 
-    def will_win(self, simulation_count=10, virtual=False):
-        combat_results = []
+    def will_win(self, simulation_count=None, virtual=False, engine=None):
         character = self.virtual_character if virtual else self.character
+        match engine or self.engine:
+            case "monte_carlo":
+                return MonteCarlo.simulate(
+                    FighterStats.from_character(character),
+                    FighterStats.from_monster(self.monster),
+                    trials=simulation_count or MonteCarlo.DEFAULT_TRIALS
+                )
+            case "analytic":
+                return dict(Analytic.solve(
+                    FighterStats.from_character(character),
+                    FighterStats.from_monster(self.monster)
+                ))
+            case "python":
+                return self._simulate_step_by_step(character, simulation_count or 10)
+            case unknown:
+                raise ValueError(f"Unknown combat engine {unknown}, expected one of {self.ENGINES}")
+
+    def _simulate_step_by_step(self, character, simulation_count):
+        combat_results = []
         for i in range(simulation_count):
             monster_hp = self.monster.get('hp')
             character_hp = character.hp
@@ -74,14 +101,14 @@ class CombatSimulator:
         winable = False
 
         for slot in Equipment.__annotations__.keys():
-            items = list(map(parse_item, filter(lambda item: slot.replace("_slot", "") == item["type"] and item[
-                "level"] <= self.virtual_character.xp.level, self.client.items)))
+            items = list(map(parse_item, filter(lambda item: item["level"] <= self.virtual_character.xp.level,
+                                                self.client.catalog.items_by_type.get(slot.replace("_slot", ""), []))))
 
             item_scores = []
 
             for item in items:
                 self.virtual_character.equip_item(item, virtual=True)
-                result = self.will_win(virtual=True)
+                result = self.will_win(virtual=True, engine=self.SCREENING_ENGINE)
                 if result["any_wins"]:
                     winable = True
                 score = (
@@ -98,3 +125,24 @@ class CombatSimulator:
             best_equipment[slot] = [item for item, score in sorted_items][::-1]
 
         return best_equipment, winable
+
+    def get_best_loadout(self, time_budget=2.0, include_bank=True, include_craftable=True) -> Loadout:
+        candidates = collect_candidates(self.client, self.character, include_bank, include_craftable)
+        return LoadoutSearch(
+            FighterStats.from_character(self.character.get_naked_character()),
+            FighterStats.from_monster(self.monster),
+            candidates,
+            time_budget=time_budget
+        ).search()
+
+    async def get_best_loadout_async(self, pool: CombatWorkerPool | None, time_budget=2.0, include_bank=True,
+                                     include_craftable=True) -> Loadout:
+        if pool is None:
+            return self.get_best_loadout(time_budget, include_bank, include_craftable)
+        candidates = collect_candidates(self.client, self.character, include_bank, include_craftable)
+        return await pool.search_loadout(
+            FighterStats.from_character(self.character.get_naked_character()),
+            self.monster["code"],
+            candidates,
+            time_budget=time_budget
+        )
@@ -0,0 +1,54 @@
+import math
+from dataclasses import dataclass
+
+from character.Character import Character
+
+ELEMENTS = ("fire", "earth", "water", "air")
+MAX_TURNS = 100
+
+
+@dataclass(frozen=True)
+class FighterStats:
+    hp: int
+    attack: tuple[int, int, int, int]
+    damage: tuple[int, int, int, int]
+    resistance: tuple[int, int, int, int]
+
+    @classmethod
+    def from_character(cls, character: Character):
+        return cls(
+            hp=character.hp,
+            attack=tuple(getattr(character.attack, element) for element in ELEMENTS),
+            damage=tuple(getattr(character.damage, element) for element in ELEMENTS),
+            resistance=tuple(getattr(character.resistance, element) for element in ELEMENTS)
+        )
+
+    @classmethod
+    def from_monster(cls, monster: dict):
+        return cls(
+            hp=monster["hp"],
+            attack=tuple(monster.get(f"attack_{element}", 0) for element in ELEMENTS),
+            damage=(0, 0, 0, 0),
+            resistance=tuple(monster.get(f"res_{element}", 0) for element in ELEMENTS)
+        )
+
+
+def character_hits(character: FighterStats, monster: FighterStats) -> list[tuple[int, float]]:
+    """(damage, block chance) of every element the character actually hits with."""
+    hits = []
+    for attack, damage, resist in zip(character.attack, character.damage, monster.resistance):
+        character_damage = attack * (1 + damage * 0.01)
+        hit = math.floor(character_damage - character_damage * resist * 0.01)
+        if hit > 0:
+            hits.append((hit, max(0.0, resist / 1000)))
+    return hits
+
+
+def monster_hits(monster: FighterStats, character: FighterStats) -> list[tuple[int, float]]:
+    """(damage, block chance) of every element the monster actually hits with."""
+    hits = []
+    for attack, resist in zip(monster.attack, character.resistance):
+        hit = math.ceil(attack - attack * resist * 0.01)
+        if hit > 0:
+            hits.append((hit, max(0.0, resist / 1000)))
+    return hits
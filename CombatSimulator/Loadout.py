@@ -0,0 +1,216 @@
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from CombatSimulator import Analytic
+from CombatSimulator.Fighters import ELEMENTS, FighterStats
+from character.Character import Character, Equipment
+
+COMBAT_SLOTS = [slot for slot in Equipment.__annotations__ if not slot.startswith("consumable")]
+# ring1_slot -> ring, artifact2_slot -> artifact, body_armor_slot -> body_armor
+SLOT_TYPES = {slot: slot.removesuffix("_slot").rstrip("123") for slot in COMBAT_SLOTS}
+STAT_NAMES = ("hp", *(f"{stat}_{element}" for stat in ("attack", "dmg", "res") for element in ELEMENTS))
+UNLIMITED = math.inf
+
+
+@dataclass(frozen=True)
+class Candidate:
+    code: str | None
+    vector: tuple[int, ...]
+    source: str
+    available: float = UNLIMITED
+
+
+@dataclass
+class Loadout:
+    slots: dict[str, Candidate | None]
+    stats: FighterStats
+    outcome: dict
+    complete: bool
+    evaluations: int = 0
+    elapsed: float = 0.0
+    items: dict[str, str | None] = field(init=False)
+
+    def __post_init__(self):
+        self.items = {slot: candidate.code if candidate else None for slot, candidate in self.slots.items()}
+
+
+def item_vector(item: dict) -> tuple[int, ...]:
+    effects = {effect["name"]: effect["value"] for effect in item.get("effects") or []}
+    return tuple(effects.get(name, 0) for name in STAT_NAMES)
+
+
+def add_vectors(stats: FighterStats, vector: tuple[int, ...]) -> FighterStats:
+    return FighterStats(
+        hp=stats.hp + vector[0],
+        attack=tuple(a + b for a, b in zip(stats.attack, vector[1:5])),
+        damage=tuple(a + b for a, b in zip(stats.damage, vector[5:9])),
+        resistance=tuple(a + b for a, b in zip(stats.resistance, vector[9:13]))
+    )
+
+
+def collect_candidates(client, character: Character, include_bank=True, include_craftable=True):
+    """Every combat item the character could wear, grouped by item type, with how many copies it can get."""
+    level = character.xp.level
+    skills = {skill.name: skill.level for skill in character.skills}
+    owned: dict[str, tuple[str, float]] = {}
+
+    def offer(code, source, quantity):
+        item = client.catalog.items_by_code.get(code)
+        if not item or item["type"] not in SLOT_TYPES.values() or item["level"] > level:
+            return
+        known_source, known_quantity = owned.get(code, (source, 0))
+        owned[code] = (known_source, known_quantity + quantity)
+
+    for slot, item in character.equipment:
+        if slot in SLOT_TYPES and item:
+            offer(item.code, "equipped", 1)
+    if (state := client.characters.get(character.name)) is not None:
+        for inventory_slot in state["inventory"]:
+            if inventory_slot["code"]:
+                offer(inventory_slot["code"], "inventory", inventory_slot["quantity"])
+    else:
+        for item in character.inventory.items:
+            offer(item.code, "inventory", 1)
+    if include_bank:
+        for bank_item in client.bank.items():
+            offer(bank_item["code"], "bank", bank_item["quantity"])
+    if include_craftable:
+        for item_type in set(SLOT_TYPES.values()):
+            for item in client.catalog.items_by_type.get(item_type, []):
+                craft = item.get("craft")
+                if craft and skills.get(craft["skill"], 0) >= craft["level"] and item["code"] not in owned:
+                    offer(item["code"], "craft", UNLIMITED)
+
+    candidates = defaultdict(list)
+    for code, (source, quantity) in owned.items():
+        item = client.catalog.item(code)
+        candidates[item["type"]].append(Candidate(code, item_vector(item), source, quantity))
+    return candidates
+
+
+class LoadoutSearch:
+    """Branch and bound over every combat slot at once.
+
+    Items are scored together, so slot interactions (an elemental weapon with matching
+    damage rings, resistances against the monster's element...) are accounted for.
+    Dominated items are dropped up front, a branch is cut when even the best possible
+    items in every remaining slot cannot beat the incumbent's win probability, and every
+    stat vector is evaluated once by the analytic solver.
+    """
+
+    def __init__(self, base: FighterStats, monster: FighterStats, candidates: dict[str, list[Candidate]],
+                 time_budget: float = 2.0):
+        self.base = base
+        self.monster = monster
+        self.candidates = candidates
+        self.time_budget = time_budget
+        self.scores: dict[FighterStats, tuple] = {}
+
+    def _relevant_stats(self) -> tuple[bool, ...]:
+        # damage bonus only matters for elements something attacks with,
+        # resistance only for elements the monster attacks with
+        attacking = [
+            self.base.attack[i] > 0 or any(c.vector[1 + i] > 0 for cs in self.candidates.values() for c in cs)
+            for i in range(len(ELEMENTS))
+        ]
+        return (True, *([True] * len(ELEMENTS)), *attacking, *(attack > 0 for attack in self.monster.attack))
+
+    def _prepare(self):
+        relevant = self._relevant_stats()
+        empty = Candidate(None, (0,) * len(STAT_NAMES), "empty")
+        slot_counts = defaultdict(int)
+        for slot in COMBAT_SLOTS:
+            slot_counts[SLOT_TYPES[slot]] += 1
+        self.options: list[list[Candidate]] = []
+        for slot in COMBAT_SLOTS:
+            slot_type = SLOT_TYPES[slot]
+            options = [empty] + [
+                Candidate(c.code, tuple(v if keep else 0 for v, keep in zip(c.vector, relevant)), c.source, c.available)
+                for c in self.candidates.get(slot_type, [])
+            ]
+            options = self._prune(options, slot_counts[slot_type])
+            options.sort(key=lambda option: self._score(add_vectors(self.base, option.vector)), reverse=True)
+            self.options.append(options)
+
+        # best conceivable stat gain from slot i onwards, used as an optimistic bound
+        self.suffix_bound = [(0,) * len(STAT_NAMES)] * (len(COMBAT_SLOTS) + 1)
+        for i in range(len(COMBAT_SLOTS) - 1, -1, -1):
+            slot_max = tuple(max(values) for values in zip(*(option.vector for option in self.options[i])))
+            self.suffix_bound[i] = tuple(a + b for a, b in zip(self.suffix_bound[i + 1], slot_max))
+
+    @staticmethod
+    def _prune(options: list[Candidate], copies_needed: int) -> list[Candidate]:
+        kept = []
+        for option in options:
+            dominating_copies = sum(
+                other.available for other in options
+                if other is not option and other.vector != option.vector
+                and all(a >= b for a, b in zip(other.vector, option.vector))
+            )
+            if dominating_copies < copies_needed:
+                kept.append(option)
+        return kept
+
+    def _score(self, stats: FighterStats) -> tuple:
+        if (score := self.scores.get(stats)) is None:
+            outcome = Analytic.solve(stats, self.monster)
+            score = self.scores[stats] = (
+                round(outcome["win_probability"], 9), -outcome["avg_turns"], outcome["character_hp"]
+            )
+        return score
+
+    def search(self) -> Loadout:
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        self._prepare()
+        self.best_score = None
+        self.best_picks: list[Candidate] = []
+        self.complete = True
+        picks: list[Candidate] = []
+        used: dict[str | None, int] = defaultdict(int)
+
+        def explore(index: int, vector: tuple[int, ...], first_option: dict[str, int]):
+            # the first (greedy) descent always finishes so there is an incumbent to return
+            if self.best_score is not None and time.monotonic() > deadline:
+                self.complete = False
+                return
+            if index == len(COMBAT_SLOTS):
+                score = self._score(add_vectors(self.base, vector))
+                if self.best_score is None or score > self.best_score:
+                    self.best_score, self.best_picks = score, list(picks)
+                return
+            if self.best_score is not None:
+                # only the win probability is monotonic in the stats: extra hp on a losing
+                # character drags the fight out, so the turns and hp tie-breaks cannot be bounded
+                bound = tuple(a + b for a, b in zip(vector, self.suffix_bound[index]))
+                if self._score(add_vectors(self.base, bound))[0] < self.best_score[0]:
+                    return
+            slot_type = SLOT_TYPES[COMBAT_SLOTS[index]]
+            # rings and artifacts are interchangeable between their slots, only walk one ordering
+            start = first_option.get(slot_type, 0)
+            for i in range(start, len(self.options[index])):
+                option = self.options[index][i]
+                if option.code is not None and used[option.code] >= option.available:
+                    continue
+                used[option.code] += 1
+                picks.append(option)
+                explore(index + 1, tuple(a + b for a, b in zip(vector, option.vector)), {**first_option, slot_type: i})
+                picks.pop()
+                used[option.code] -= 1
+
+        explore(0, (0,) * len(STAT_NAMES), {})
+        # the search ran on vectors stripped of irrelevant stats, report the real items
+        by_code = {candidate.code: candidate for options in self.candidates.values() for candidate in options}
+        chosen = [by_code.get(pick.code) for pick in self.best_picks]
+        stats = add_vectors(self.base, tuple(map(sum, zip(*(pick.vector for pick in chosen if pick)))) or
+                            (0,) * len(STAT_NAMES))
+        return Loadout(
+            slots=dict(zip(COMBAT_SLOTS, chosen)),
+            stats=stats,
+            outcome=dict(Analytic.solve(stats, self.monster)),
+            complete=self.complete,
+            evaluations=len(self.scores),
+            elapsed=time.monotonic() - started
+        )
@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+
+from CombatSimulator.Fighters import FighterStats, MAX_TURNS, character_hits, monster_hits
+
+DEFAULT_TRIALS = 2000
+
+
+def _cumulative_damage(hits: list[tuple[int, float]], attacks: int, trials: int, rng: np.random.Generator):
+    if not hits:
+        return np.zeros((attacks, trials), dtype=np.int64)
+    damage = np.array([hit for hit, _ in hits], dtype=np.int64)
+    block_chance = np.array([chance for _, chance in hits])
+    landed = rng.random((attacks, trials, len(hits))) > block_chance
+    return np.cumsum(landed @ damage, axis=0)
+
+
+def _first_at_least(cumulative: np.ndarray, threshold: int) -> np.ndarray:
+    """Index of the first attack reaching ``threshold`` for every trial, or ``len(cumulative)``."""
+    reached = cumulative >= threshold
+    return np.where(reached.any(axis=0), reached.argmax(axis=0), len(cumulative))
+
+
+def wilson_interval(wins: int, trials: int, z: float = 1.96) -> tuple[float, float]:
+    if not trials:
+        return 0.0, 1.0
+    p = wins / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def simulate(character: FighterStats, monster: FighterStats, trials: int = DEFAULT_TRIALS,
+             rng: np.random.Generator | None = None, max_turns: int = MAX_TURNS) -> dict:
+    """Run ``trials`` fights at once as (attacks x trials) arrays.
+
+    The character strikes on odd half-turns and the monster on even ones, the same
+    turn order as the step-by-step simulation; a fight still going after ``max_turns``
+    half-turns counts as a loss.
+    """
+    rng = rng or np.random.default_rng()
+    attacks = (max_turns + 1) // 2
+    dealt = _cumulative_damage(character_hits(character, monster), attacks, trials, rng)
+    taken = _cumulative_damage(monster_hits(monster, character), attacks, trials, rng)
+
+    kill_at = _first_at_least(dealt, monster.hp)
+    death_at = _first_at_least(taken, character.hp)
+    won = (kill_at <= death_at) & (kill_at < attacks)
+    lost = ~won & (death_at < attacks)
+    # half-turn on which each fight ended, counted from 1 like the step-by-step simulation
+    half_turns = np.where(won, 2 * kill_at + 1, np.where(lost, 2 * death_at + 2, 2 * attacks))
+
+    trial = np.arange(trials)
+    character_strikes = np.minimum(np.where(won, kill_at + 1, death_at + 1), attacks)
+    monster_strikes = np.minimum(np.where(won, kill_at, death_at + 1), attacks)
+    padded_dealt = np.vstack((np.zeros((1, trials), dtype=np.int64), dealt))
+    padded_taken = np.vstack((np.zeros((1, trials), dtype=np.int64), taken))
+    character_hp = character.hp - padded_taken[monster_strikes, trial]
+    monster_hp = monster.hp - padded_dealt[character_strikes, trial]
+
+    turns = half_turns + 1
+    wins = int(won.sum())
+    turn_values, turn_counts = np.unique(turns, return_counts=True)
+    quantiles = (5, 25, 50, 75, 95)
+    return {
+        "all_wins": wins == trials,
+        "any_wins": wins > 0,
+        "avg_turns": float(turns.mean()),
+        "character_hp": float(character_hp.mean()),
+        "monster_hp": float(monster_hp.mean()),
+        "win_probability": wins / trials,
+        "confidence_interval": wilson_interval(wins, trials),
+        "turns_distribution": {int(t): c / trials for t, c in zip(turn_values, turn_counts)},
+        "character_hp_quantiles": dict(zip(quantiles, np.percentile(character_hp, quantiles).tolist())),
+        "monster_hp_quantiles": dict(zip(quantiles, np.percentile(monster_hp, quantiles).tolist())),
+        "trials": trials
+    }
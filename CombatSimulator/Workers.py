@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from CombatSimulator import Analytic, MonteCarlo
+from CombatSimulator.Fighters import FighterStats
+from CombatSimulator.Loadout import Candidate, Loadout, LoadoutSearch, add_vectors, item_vector
+
+# per-process catalog, filled once by the pool initializer
+_item_vectors: dict[str, tuple[int, ...]] = {}
+_monsters: dict[str, FighterStats] = {}
+
+
+@dataclass(frozen=True)
+class CombatJob:
+    character: FighterStats
+    monster: str
+    loadout: tuple[str | None, ...] = ()
+
+
+def _init_worker(items: dict[str, dict], monsters: dict[str, dict]):
+    _item_vectors.update({code: item_vector(item) for code, item in items.items()})
+    _monsters.update({code: FighterStats.from_monster(monster) for code, monster in monsters.items()})
+
+
+def _evaluate(jobs: list[CombatJob], engine: str, trials: int) -> list[dict]:
+    results = []
+    for job in jobs:
+        gear = [_item_vectors[code] for code in job.loadout if code]
+        stats = add_vectors(job.character, tuple(map(sum, zip(*gear)))) if gear else job.character
+        monster = _monsters[job.monster]
+        if engine == "analytic":
+            results.append(dict(Analytic.solve(stats, monster)))
+        else:
+            results.append(MonteCarlo.simulate(stats, monster, trials=trials))
+    return results
+
+
+def _search_loadout(base: FighterStats, monster: str, candidates: dict[str, list[Candidate]],
+                    time_budget: float) -> Loadout:
+    return LoadoutSearch(base, _monsters[monster], candidates, time_budget=time_budget).search()
+
+
+class CombatWorkerPool:
+    """Runs combat evaluations and loadout searches in separate processes.
+
+    The catalog is handed to each worker once through the pool initializer, so jobs
+    only carry fighter stats and item codes. Every call returns an awaitable, which
+    keeps heavy planning off the event loop that drives the characters.
+    """
+
+    def __init__(self, items: dict[str, dict], monsters: dict[str, dict], processes: int | None = None,
+                 start_method: str = "spawn"):
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(items, monsters)
+        )
+
+    @classmethod
+    def from_client(cls, client, processes: int | None = None):
+        return cls(client.catalog.items_by_code, client.catalog.monsters_by_code, processes=processes)
+
+    async def evaluate(self, jobs: list[CombatJob], engine="analytic", trials=MonteCarlo.DEFAULT_TRIALS) -> list[dict]:
+        if not jobs:
+            return []
+        loop = asyncio.get_running_loop()
+        # a few chunks per worker keeps them all busy without paying IPC per job
+        chunk_size = max(1, len(jobs) // (self.processes * 4))
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self.executor, _evaluate, chunk, engine, trials) for chunk in chunks)
+        )
+        return [result for chunk in results for result in chunk]
+
+    async def search_loadout(self, base: FighterStats, monster: str, candidates: dict[str, list[Candidate]],
+                             time_budget: float = 2.0) -> Loadout:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _search_loadout, base, monster, dict(candidates), time_budget
+        )
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
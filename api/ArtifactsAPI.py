@@ -1,21 +1,38 @@
-import json
+import asyncio
 import os
 
-import requests
 from dotenv import load_dotenv
 from singleton.singleton import Singleton
 
+from api.BankLedger import BankLedger
+from api.Catalog import Catalog
+from api.CatalogCache import CatalogCache
+from api.CharacterStore import CharacterStore
+from api.Clock import Clock, VirtualClock
+from api.RateLimiter import RateLimiter
+from api.Scheduler import Scheduler
+from api.Transport import RecordingTransport, ReplayTransport, Transport
 from api.urls import *
+from monitoring.EventLog import EventLog
+from monitoring.Metrics import Metrics
 from utils import Slots, task, Locations, skill_to_location, MakeshiftLocation
 
 
 @Singleton
 class ArtifactsAPI:
     ROOT_URL = "https://api.artifactsmmo.com"
+    CATALOG_CACHE_PATH = ".cache/catalog.pickle"
+    CATALOG_TTL = 24 * 60 * 60
+    FETCH_CONCURRENCY = 8
 
-    def __init__(self):
+    def __init__(self, refresh_catalogs=False, clock: Clock | None = None, transport: Transport | None = None,
+                 catalog_cache_path: str | None = None):
         load_dotenv()
         token = os.environ.get("API_TOKEN")
+        # point the client at a local stand-in such as mock/MockServer.py
+        self.ROOT_URL = os.environ.get("API_ROOT_URL", self.ROOT_URL)
+        # API_VIRTUAL_TIME skips cooldowns in simulated time, see mock/Simulation.py
+        self.clock = clock or (VirtualClock() if os.environ.get("API_VIRTUAL_TIME") else Clock())
 
         self.headers = {
             "Accept": "application/json",
@@ -23,113 +40,192 @@ class ArtifactsAPI:
             "Authorization": f"Bearer {token}"
         }
 
-        self.tiles = self._fetch_pages(MAPS)
-        self.monsters = self._fetch_pages(MONSTERS)
-        self.resources = self._fetch_pages(RESOURCES)
-        self.items = self._fetch_pages(ITEMS)
-        self.monster_drops = {monster["code"]: monster["drops"] for monster in self.monsters}
-        self.occupied_tiles = [tile for tile in self.tiles if tile["content"]]
-
-    def _post(self, url, data=None):
-        if data is None:
-            data = dict()
-        return requests.post(self.ROOT_URL + url, headers=self.headers, data=json.dumps(data), allow_redirects=True)
-
-    def _get(self, url):
-        return requests.get(self.ROOT_URL + url, headers=self.headers)
-
-    def _fetch_pages(self, url):
-        data = []
-        n = 1
-        end = 2
-        while n <= end:
-            response = self._get(url + f"?size=100&page={n}").json()
-            data.extend(response["data"])
-            end = response["pages"]
-            n += 1
-        return data
+        # API_RECORD / API_REPLAY capture a run to a file and serve it back, see mock/Replay.py
+        if transport is None and (path := os.environ.get("API_RECORD")):
+            transport = RecordingTransport(self.headers, path, self.clock)
+        elif transport is None and (path := os.environ.get("API_REPLAY")):
+            transport = ReplayTransport(self.headers, path)
+        self.transport = transport or Transport(self.headers)
+        # a recording carries its own catalogs so it replays the same anywhere
+        refresh_catalogs = refresh_catalogs or isinstance(self.transport, (RecordingTransport, ReplayTransport))
+        self.catalog_cache = CatalogCache(catalog_cache_path or self.CATALOG_CACHE_PATH, ttl=self.CATALOG_TTL)
+        self.characters = CharacterStore()
+        self.bank = BankLedger()
+        self.scheduler = Scheduler(self.clock)
+        self.rate_limiter = RateLimiter(clock=self.clock)
+        self.events = EventLog(clock=self.clock)
+        self.metrics = Metrics(clock=self.clock)
+        self._pending: dict[str, asyncio.Future] = {}
+
+        asyncio.run(self._load_catalogs(refresh_catalogs))
+        self.catalog = Catalog(self.tiles, self.monsters, self.resources, self.items, version=self.catalog_version)
+        self.monster_drops = self.catalog.monster_drops
+        self.occupied_tiles = self.catalog.occupied_tiles
+
+    async def _load_catalogs(self, refresh=False):
+        try:
+            server_version = await self.server_version()
+            snapshot = None if refresh else self.catalog_cache.load(server_version)
+            if snapshot is None:
+                limit = asyncio.Semaphore(self.FETCH_CONCURRENCY)
+                tiles, monsters, resources, items = await asyncio.gather(
+                    *(self._fetch_pages(url, limit) for url in (MAPS, MONSTERS, RESOURCES, ITEMS))
+                )
+                snapshot = self.catalog_cache.save(
+                    server_version, tiles=tiles, monsters=monsters, resources=resources, items=items
+                )
+        finally:
+            await self.transport.close()
+        # the server version alone is shared by every snapshot taken against one server build
+        self.catalog_version = f"{snapshot['server_version']}@{snapshot['saved_at']}"
+        self.tiles = snapshot["tiles"]
+        self.monsters = snapshot["monsters"]
+        self.resources = snapshot["resources"]
+        self.items = snapshot["items"]
+
+    async def _post(self, url, data=None):
+        queued = self.clock.monotonic()
+        await self.rate_limiter.acquire(RateLimiter.ACTION)
+        sent = self.clock.monotonic()
+        with self.clock.busy():
+            response = await self.transport.post(self.ROOT_URL + url, data)
+        # /my/{name}/action/{action}
+        parts = url.split("/")
+        self.metrics.record_request("action", "/".join(parts[4:]), parts[2], sent - queued,
+                                    self.clock.monotonic() - sent)
+        return response
+
+    async def _get(self, url):
+        queued = self.clock.monotonic()
+        await self.rate_limiter.acquire(RateLimiter.DATA)
+        sent = self.clock.monotonic()
+        with self.clock.busy():
+            response = await self.transport.get(self.ROOT_URL + url)
+        endpoint = "/" + url.split("?")[0].strip("/").split("/")[0]
+        self.metrics.record_request("data", endpoint, None, sent - queued, self.clock.monotonic() - sent)
+        return response
+
+    async def _coalesce(self, key, fetch):
+        # concurrent callers share one in-flight download
+        pending = self._pending.get(key)
+        if pending is None or pending.done() or pending.get_loop() is not asyncio.get_running_loop():
+            pending = self._pending[key] = asyncio.ensure_future(fetch())
+        return await asyncio.shield(pending)
+
+    async def close(self):
+        await self.transport.close()
+        await asyncio.to_thread(self.events.close)
+
+    async def _fetch_pages(self, url, limit: asyncio.Semaphore | None = None):
+        limit = limit or asyncio.Semaphore(self.FETCH_CONCURRENCY)
+
+        async def fetch_page(n):
+            async with limit:
+                return await self._get(url + f"?size=100&page={n}")
+
+        first = await fetch_page(1)
+        rest = await asyncio.gather(*(fetch_page(n) for n in range(2, (first["pages"] or 1) + 1)))
+        return [row for page in (first, *rest) for row in page["data"]]
 
     @task
-    def move(self, name, x, y):
+    async def move(self, name, x, y):
         data = {
             "x": x,
             "y": y
         }
-        return self._post(MOVE.replace("{name}", name), data)
+        return await self._post(MOVE.replace("{name}", name), data)
 
     @task
-    def deposit_item_in_bank(self, name, item_code, qtt):
+    async def deposit_item_in_bank(self, name, item_code, qtt):
         data = {
             "code": item_code,
             "quantity": qtt
         }
-        return self._post(BANK_DEPOSIT.replace("{name}", name), data=data)
+        response = await self._post(BANK_DEPOSIT.replace("{name}", name), data=data)
+        self.bank.apply(response, item_code, qtt)
+        return response
 
     @task
-    def fight(self, name):
-        return self._post(FIGHT.replace("{name}", name))
+    async def fight(self, name):
+        return await self._post(FIGHT.replace("{name}", name))
 
     @task
-    def gather_resource(self, name):
-        return self._post(GATHER_RESOURCE.replace("{name}", name))
+    async def gather_resource(self, name):
+        return await self._post(GATHER_RESOURCE.replace("{name}", name))
 
     @task
-    def craft(self, name, qtt=1, code="copper_dagger"):
+    async def craft(self, name, qtt=1, code="copper_dagger"):
         data = {
             "code": code,
             "quantity": qtt
         }
-        return self._post(CRAFT.replace("{name}", name), data=data)
+        return await self._post(CRAFT.replace("{name}", name), data=data)
 
     @task
-    def get_new_task(self, name):
-        return self._post(NEW_TASK.replace("{name}", name))
+    async def get_new_task(self, name):
+        return await self._post(NEW_TASK.replace("{name}", name))
 
     @task
-    def unequip(self, name, slot=Slots.WEAPON):
+    async def unequip(self, name, slot=Slots.WEAPON):
         data = {
             "slot": slot.value
         }
-        return self._post(UNEQUIP.replace("{name}", name), data=data)
+        return await self._post(UNEQUIP.replace("{name}", name), data=data)
 
     @task
-    def equip(self, name, item, slot=Slots.WEAPON):
+    async def equip(self, name, item, slot=Slots.WEAPON):
         data = {
             "code": item,
             "slot": slot.value
         }
-        return self._post(EQUIP.replace("{name}", name), data=data)
+        return await self._post(EQUIP.replace("{name}", name), data=data)
 
     @task
-    def retrieve_item_from_bank(self, name, item, quantity):
+    async def retrieve_item_from_bank(self, name, item, quantity):
         data = {
             "code": item,
             "quantity": quantity
         }
-        return self._post(BANK_WITHDRAW.replace("{name}", name), data=data)
+        response = await self._post(BANK_WITHDRAW.replace("{name}", name), data=data)
+        self.bank.apply(response, item, -quantity)
+        self.bank.release(name, item, quantity)
+        return response
 
-    def get_map_cell(self, location: Locations | tuple):
+    async def get_map_cell(self, location: Locations | tuple):
         x, y = location.value
-        return self._get(MAP_TILE.replace("{x}", str(x)).replace("{y}", str(y))).json()
+        return await self._get(MAP_TILE.replace("{x}", str(x)).replace("{y}", str(y)))
 
-    def get_bank_items(self):
-        return self._get(BANK_ITEMS).json()["data"]
+    async def sync_bank(self):
+        return await self._coalesce(BANK_ITEMS, self._fetch_bank)
 
-    def get_all_characters_data(self):
-        return self._get(ALL_CHARACTERS_DATA).json()["data"]
+    async def _fetch_bank(self):
+        self.bank.load(await self._fetch_pages(BANK_ITEMS))
 
-    def get_characters_data(self, name):
-        data = self._get(ALL_CHARACTERS_DATA).json()["data"]
-        char = next(filter(lambda c: c["name"] == name, data))
-        return char
+    async def get_bank_items(self, refresh=False):
+        if refresh or not self.bank.is_fresh():
+            await self.sync_bank()
+        return self.bank.items()
 
-    def get_char_inventory(self, name):
-        data = self._get(ALL_CHARACTERS_DATA).json()["data"]
-        char = next(filter(lambda c: c["name"] == name, data))
-        return char["inventory"]
+    async def get_all_characters_data(self):
+        data = (await self._get(ALL_CHARACTERS_DATA))["data"]
+        self.characters.load(data)
+        for character in data:
+            self.scheduler.update_from_character(character)
+        return data
+
+    async def sync_characters(self):
+        return await self._coalesce(ALL_CHARACTERS_DATA, self.get_all_characters_data)
+
+    async def get_characters_data(self, name, refresh=False):
+        if refresh or not self.characters.is_fresh(name):
+            await self.sync_characters()
+        return self.characters.get(name)
+
+    async def get_char_inventory(self, name):
+        return (await self.get_characters_data(name))["inventory"]
 
     def get_item(self, item_code):
-        return next(filter(lambda i: i["code"] == item_code, self.items))
+        return self.catalog.item(item_code)
 
     def get_item_recipie(self, item_code):
         try:
@@ -139,32 +235,38 @@ class ArtifactsAPI:
         except TypeError:
             return None
 
-    def get_item_location(self, item_code):
-        # check if it's a monster tile
-        try:
-            monster = next(filter(lambda m: item_code in str(self.monster_drops[m]), self.monster_drops))
-            tile = next(filter(lambda t: monster in str(t), self.occupied_tiles))
-            return MakeshiftLocation(tile["name"].capitalize(), (tile["x"], tile["y"]))
-        except StopIteration:
-            # check if it's a resource tile
-            try:
-                resource = next(filter(lambda r: item_code in str(r), self.resources))["code"]
-                tile = next(filter(lambda t: resource in str(t), self.occupied_tiles))
-                return MakeshiftLocation(tile["name"].capitalize(), (tile["x"], tile["y"]))
-            except StopIteration:
-                # so this is a workbench tile
-                item = next(filter(lambda i: i["code"] == item_code, self.items))
-                return skill_to_location[item["craft"]["skill"]]
+    def get_item_location(self, item_code, origin=Locations.BANK.value):
+        # check if it's a monster tile, then a resource tile
+        for source in self.catalog.monsters_dropping(item_code) + self.catalog.resources_dropping(item_code):
+            if tile := self.catalog.index.nearest(origin, content=source["code"]):
+                return self.tile_location(tile)
+        # so this is a workbench tile
+        skill = self.get_item(item_code)["craft"]["skill"]
+        if tile := self.catalog.index.nearest(origin, content=skill):
+            return self.tile_location(tile)
+        return skill_to_location[skill]
 
     def get_monster_by_code(self, monster_code):
-        return next(filter(lambda m: m["code"] == monster_code, self.monsters))
+        return self.catalog.monster(monster_code)
+
+    def get_location_by_monster(self, monster_code, origin=Locations.BANK.value):
+        return self.get_nearest_location(origin, content=monster_code)
 
-    def get_location_by_monster(self, monster_code):
-        tile = next(filter(lambda t: monster_code in str(t), self.tiles))
+    def get_nearest_location(self, origin, content=None, content_type=None):
+        return self.tile_location(self.catalog.index.nearest(origin, content=content, content_type=content_type))
+
+    @staticmethod
+    def tile_location(tile):
         return MakeshiftLocation(tile["name"].capitalize(), (tile["x"], tile["y"]))
 
-    def server_is_up(self):
+    async def server_version(self):
+        try:
+            return (await self._get("/"))["data"]["version"]
+        except:
+            return None
+
+    async def server_is_up(self):
         try:
-            return self._get("/").json()["data"]["status"] == "online"
+            return (await self._get("/"))["data"]["status"] == "online"
         except:
             return False
@@ -0,0 +1,68 @@
+from collections import defaultdict
+
+
+class BankLedger:
+    """Account bank contents shared by all characters.
+
+    Loaded once, then kept current from deposit/withdraw responses. Characters
+    reserve stock before planning against it so two crafters never count the
+    same items; a reservation is released once its owner withdraws the items.
+    """
+
+    def __init__(self):
+        self._items: dict[str, int] = {}
+        self._reservations: dict[str, dict[str, int]] = defaultdict(dict)
+        self._fresh = False
+
+    def load(self, items: list[dict]):
+        self._items = {item["code"]: item["quantity"] for item in items if item["code"]}
+        self._fresh = True
+
+    def apply(self, response: dict, item_code: str, delta: int):
+        if "error" in response:
+            # the server disagrees with what we think is in the bank
+            if response["error"]["code"] in (404, 478):
+                self.invalidate()
+            return
+        if bank := response.get("data", {}).get("bank"):
+            self.load(bank)
+        else:
+            self._items[item_code] = self._items.get(item_code, 0) + delta
+            if self._items[item_code] <= 0:
+                del self._items[item_code]
+
+    def invalidate(self):
+        self._fresh = False
+
+    def is_fresh(self) -> bool:
+        return self._fresh
+
+    def items(self) -> list[dict]:
+        return [{"code": code, "quantity": quantity} for code, quantity in self._items.items()]
+
+    def quantity(self, item_code: str) -> int:
+        return self._items.get(item_code, 0)
+
+    def reserved(self, item_code: str, exclude: str | None = None) -> int:
+        return sum(items.get(item_code, 0) for owner, items in self._reservations.items() if owner != exclude)
+
+    def available(self, item_code: str, owner: str | None = None) -> int:
+        return max(0, self.quantity(item_code) - self.reserved(item_code, exclude=owner))
+
+    def reserve(self, owner: str, item_code: str, quantity: int) -> int:
+        reserved = self._reservations[owner].get(item_code, 0)
+        granted = min(quantity, self.available(item_code, owner=owner) - reserved)
+        if granted > 0:
+            self._reservations[owner][item_code] = reserved + granted
+        return max(0, granted)
+
+    def release(self, owner: str, item_code: str | None = None, quantity: int | None = None):
+        reservations = self._reservations[owner]
+        if item_code is None:
+            reservations.clear()
+            return
+        left = reservations.get(item_code, 0) - (quantity if quantity is not None else reservations.get(item_code, 0))
+        if left > 0:
+            reservations[item_code] = left
+        else:
+            reservations.pop(item_code, None)
@@ -0,0 +1,62 @@
+import uuid
+from collections import defaultdict
+
+from api.SpatialIndex import SpatialIndex
+
+
+class Catalog:
+    """Static game data with hash indexes built once at load time."""
+
+    def __init__(self, tiles: list[dict], monsters: list[dict], resources: list[dict], items: list[dict],
+                 version: str | None = None):
+        # identifies the data, models derived from the catalog are cached per version
+        self.version = version or uuid.uuid4().hex
+        self.tiles = tiles
+        self.monsters = monsters
+        self.resources = resources
+        self.items = items
+
+        self.items_by_code: dict[str, dict] = {item["code"]: item for item in items}
+        self.monsters_by_code: dict[str, dict] = {monster["code"]: monster for monster in monsters}
+        self.resources_by_code: dict[str, dict] = {resource["code"]: resource for resource in resources}
+
+        self.items_by_type: dict[str, list[dict]] = defaultdict(list)
+        for item in items:
+            self.items_by_type[item["type"]].append(item)
+
+        self.occupied_tiles = [tile for tile in tiles if tile["content"]]
+        self.tiles_by_content: dict[str, list[dict]] = defaultdict(list)
+        self.tiles_by_content_type: dict[str, list[dict]] = defaultdict(list)
+        for tile in self.occupied_tiles:
+            self.tiles_by_content[tile["content"]["code"]].append(tile)
+            self.tiles_by_content_type[tile["content"]["type"]].append(tile)
+
+        self.monster_drops = {monster["code"]: monster["drops"] for monster in monsters}
+        self.monsters_by_drop: dict[str, list[dict]] = defaultdict(list)
+        for monster in monsters:
+            for drop in monster["drops"]:
+                self.monsters_by_drop[drop["code"]].append(monster)
+        self.resources_by_drop: dict[str, list[dict]] = defaultdict(list)
+        for resource in resources:
+            for drop in resource["drops"]:
+                self.resources_by_drop[drop["code"]].append(resource)
+
+        self.index = SpatialIndex(tiles)
+
+    def item(self, code: str) -> dict:
+        return self.items_by_code[code]
+
+    def monster(self, code: str) -> dict:
+        return self.monsters_by_code[code]
+
+    def resource(self, code: str) -> dict:
+        return self.resources_by_code[code]
+
+    def tiles_with(self, content_code: str) -> list[dict]:
+        return self.tiles_by_content.get(content_code, [])
+
+    def monsters_dropping(self, item_code: str) -> list[dict]:
+        return self.monsters_by_drop.get(item_code, [])
+
+    def resources_dropping(self, item_code: str) -> list[dict]:
+        return self.resources_by_drop.get(item_code, [])
@@ -0,0 +1,46 @@
+import os
+import pickle
+import time
+
+
+class CatalogCache:
+    """Versioned local snapshot of the static game data (maps, monsters, resources, items).
+
+    A snapshot is reused while it was taken against the same server version and is
+    younger than ``ttl`` seconds; otherwise it is considered stale and rebuilt.
+    """
+    FORMAT = 1
+
+    def __init__(self, path: str, ttl: float = 24 * 60 * 60):
+        self.path = path
+        self.ttl = ttl
+
+    def load(self, server_version: str | None) -> dict | None:
+        try:
+            with open(self.path, "rb") as file:
+                snapshot = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if snapshot.get("format") != self.FORMAT:
+            return None
+        # server unreachable: a stale snapshot beats no data at all
+        if server_version is None:
+            return snapshot
+        if snapshot["server_version"] != server_version or time.time() - snapshot["saved_at"] > self.ttl:
+            return None
+        return snapshot
+
+    def save(self, server_version: str | None, **data: list[dict]) -> dict:
+        snapshot = {"format": self.FORMAT, "server_version": server_version, "saved_at": time.time(), **data}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        return snapshot
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
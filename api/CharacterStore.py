@@ -0,0 +1,51 @@
+class CharacterStore:
+    """Local mirror of every character's state.
+
+    Action endpoints return the updated character, so the mirror is kept current
+    from responses and only re-synced from ``/my/characters`` on demand or after
+    an action failed in a way that means our view of the character is off.
+    """
+
+    def __init__(self):
+        self._characters: dict[str, dict] = {}
+        self._stale: set[str] = set()
+        # bumped on every update, so anything derived from a character can tell it is out of date
+        self._versions: dict[str, int] = {}
+
+    def load(self, characters: list[dict]):
+        for character in characters:
+            self.update(character)
+
+    def update(self, character: dict):
+        name = character["name"]
+        self._characters[name] = character
+        self._stale.discard(name)
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def update_from_response(self, response: dict):
+        try:
+            character = response["data"]["character"]
+        except (KeyError, TypeError):
+            return
+        self.update(character)
+
+    def invalidate(self, name: str | None = None):
+        if name is None:
+            self._stale.update(self._characters)
+        else:
+            self._stale.add(name)
+
+    def is_fresh(self, name: str) -> bool:
+        return name in self._characters and name not in self._stale
+
+    def version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def get(self, name: str) -> dict | None:
+        return self._characters.get(name)
+
+    def inventory(self, name: str) -> list[dict]:
+        return self._characters[name]["inventory"]
+
+    def quantity(self, name: str, item_code: str) -> int:
+        return sum(slot["quantity"] for slot in self.inventory(name) if slot["code"] == item_code)
@@ -0,0 +1,119 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import contextmanager
+
+
+class Clock:
+    """Real time; every cooldown, rate limit and duration goes through a clock so it can be simulated."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, delay: float):
+        await asyncio.sleep(delay)
+
+    async def wait_for(self, awaitable, timeout: float | None):
+        return await asyncio.wait_for(awaitable, timeout)
+
+    @contextmanager
+    def busy(self):
+        """Marks work in flight, such as an HTTP request; only the virtual clock cares."""
+        yield
+
+
+class VirtualClock(Clock):
+    """Simulated time that jumps to the next wake-up as soon as every coroutine is waiting on the clock.
+
+    Time stands still while a request is in flight, so against an in-process backend sharing
+    this clock an action costs exactly the cooldown the server granted and nothing more. Work
+    awaited outside the clock, like a thread or a process pool, does not hold time back.
+    """
+
+    # event loop passes without new work before the clock is allowed to move
+    SETTLE_PASSES = 5
+    BUSY_POLL = 0.001
+
+    def __init__(self, start: float | None = None):
+        self._now = 0.0
+        self._epoch = time.time() if start is None else start
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._busy = 0
+        self._activity = 0
+        self._advancer: asyncio.Task | None = None
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._epoch + self._now
+
+    async def sleep(self, delay: float):
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        # a positive delay always moves time forward, even one below float resolution at this hour
+        deadline = max(self._now + delay, math.nextafter(self._now, math.inf))
+        heapq.heappush(self._sleepers, (deadline, next(self._order), future))
+        self._activity += 1
+        if self._advancer is None or self._advancer.done():
+            self._advancer = asyncio.create_task(self._advance())
+        await future
+
+    async def wait_for(self, awaitable, timeout: float | None):
+        if timeout is None:
+            return await awaitable
+        waiter = asyncio.ensure_future(awaitable)
+        timer = asyncio.ensure_future(self.sleep(timeout))
+        try:
+            await asyncio.wait((waiter, timer), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            timer.cancel()
+            if not waiter.done():
+                # let the awaitable unwind, a Condition.wait has to take its lock back first
+                waiter.cancel()
+                await asyncio.wait((waiter,))
+        if waiter.cancelled():
+            raise asyncio.TimeoutError
+        return waiter.result()
+
+    @contextmanager
+    def busy(self):
+        self._busy += 1
+        try:
+            yield
+        finally:
+            self._busy -= 1
+            self._activity += 1
+
+    async def _settle(self):
+        """Return once nothing is in flight and the loop has gone a few passes without new work."""
+        quiet = 0
+        while quiet < self.SETTLE_PASSES:
+            if self._busy:
+                await asyncio.sleep(self.BUSY_POLL)
+                quiet = 0
+                continue
+            activity = self._activity
+            await asyncio.sleep(0)
+            quiet = quiet + 1 if activity == self._activity else 0
+
+    async def _advance(self):
+        while True:
+            await self._settle()
+            while self._sleepers and self._sleepers[0][2].done():
+                heapq.heappop(self._sleepers)
+            if not self._sleepers:
+                return
+            self._now = max(self._now, self._sleepers[0][0])
+            while self._sleepers and self._sleepers[0][0] <= self._now:
+                future = heapq.heappop(self._sleepers)[2]
+                if not future.done():
+                    future.set_result(None)
@@ -0,0 +1,80 @@
+from collections import defaultdict
+
+from api.Clock import Clock
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, clock: Clock | None = None):
+        self.clock = clock or Clock()
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = self.clock.monotonic()
+
+    def _refill(self):
+        now = self.clock.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token and return 0, or return how long until one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Client-side request budget shared by every character on the account.
+
+    Actions and data reads have separate buckets; reads step aside while any
+    action is waiting for a token so informational GETs never delay an action.
+    """
+    ACTION = "action"
+    DATA = "data"
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, action_rate: float = 3.5, action_burst: int = 7, data_rate: float = 16, data_burst: int = 16,
+                 clock: Clock | None = None):
+        self.clock = clock or Clock()
+        self.buckets = {
+            self.ACTION: TokenBucket(action_rate, action_burst, self.clock),
+            self.DATA: TokenBucket(data_rate, data_burst, self.clock)
+        }
+        self.waiting_actions = 0
+        self.requests: dict[str, int] = defaultdict(int)
+        self.queued_seconds: dict[str, float] = defaultdict(float)
+        self.max_queued_seconds: dict[str, float] = defaultdict(float)
+
+    async def acquire(self, kind: str):
+        started = self.clock.monotonic()
+        if kind == self.ACTION:
+            self.waiting_actions += 1
+        try:
+            while True:
+                if kind == self.DATA and self.waiting_actions:
+                    await self.clock.sleep(self.POLL_INTERVAL)
+                    continue
+                if not (delay := self.buckets[kind].try_acquire()):
+                    break
+                await self.clock.sleep(delay)
+        finally:
+            if kind == self.ACTION:
+                self.waiting_actions -= 1
+        queued = self.clock.monotonic() - started
+        self.requests[kind] += 1
+        self.queued_seconds[kind] += queued
+        self.max_queued_seconds[kind] = max(self.max_queued_seconds[kind], queued)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            kind: {
+                "requests": self.requests[kind],
+                "queued_seconds": round(self.queued_seconds[kind], 3),
+                "avg_queued_seconds": round(self.queued_seconds[kind] / self.requests[kind], 4)
+                if self.requests[kind] else 0,
+                "max_queued_seconds": round(self.max_queued_seconds[kind], 3)
+            }
+            for kind in self.buckets
+        }
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from api.Clock import Clock
+
+
+class Scheduler:
+    """Tracks when every character comes off cooldown.
+
+    Cooldowns are learned from the ``cooldown`` block of action responses (and
+    ``cooldown_expiration`` of character data), so the next action is dispatched
+    right when the character is ready instead of being bounced with a 499.
+    """
+    SAFETY_MARGIN = 0.05
+
+    def __init__(self, clock: Clock | None = None):
+        self.clock = clock or Clock()
+        self._ready_at: dict[str, float] = {}
+
+    def now(self) -> float:
+        return self.clock.monotonic()
+
+    def set_cooldown(self, name: str, seconds: float):
+        self._ready_at[name] = self.now() + max(0.0, seconds)
+
+    def update_from_response(self, name: str, response: dict):
+        try:
+            cooldown = response["data"]["cooldown"]
+        except (KeyError, TypeError):
+            return
+        self.set_cooldown(name, cooldown.get("remaining_seconds", cooldown.get("total_seconds", 0)))
+
+    def update_from_character(self, character: dict):
+        expiration = character.get("cooldown_expiration")
+        if not expiration:
+            self.set_cooldown(character["name"], 0)
+            return
+        expires_at = datetime.fromisoformat(expiration.replace("Z", "+00:00"))
+        self.set_cooldown(character["name"], expires_at.timestamp() - self.clock.time())
+
+    def ready_in(self, name: str) -> float:
+        return max(0.0, self._ready_at.get(name, 0.0) - self.now())
+
+    def is_ready(self, name: str) -> bool:
+        return self.ready_in(name) == 0
+
+    def next_ready(self, names: list[str]) -> str:
+        return min(names, key=self.ready_in)
+
+    async def wait_ready(self, name: str):
+        if delay := self.ready_in(name):
+            await self.clock.sleep(delay + self.SAFETY_MARGIN)
+
+    async def wait_any(self, names: list[str]) -> str:
+        name = self.next_ready(names)
+        await self.wait_ready(name)
+        return name
@@ -0,0 +1,122 @@
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+Position = tuple[int, int]
+
+
+def distance(a: Position, b: Position) -> int:
+    # moves are paid per tile along the grid
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class _Grid:
+    """Tiles bucketed into square cells, searched in growing rings around the query."""
+
+    # small groups are cheaper to scan than to walk rings for
+    SCAN_LIMIT = 16
+
+    def __init__(self, tiles: list[dict], cell: int):
+        self.cell = cell
+        self.tiles = tiles
+        self.buckets: dict[Position, list[dict]] = defaultdict(list)
+        for tile in tiles:
+            self.buckets[self._cell(tile["x"], tile["y"])].append(tile)
+        cells = list(self.buckets) or [(0, 0)]
+        self.bounds = (min(c[0] for c in cells), max(c[0] for c in cells), min(c[1] for c in cells),
+                       max(c[1] for c in cells))
+
+    def _cell(self, x: int, y: int) -> Position:
+        return x // self.cell, y // self.cell
+
+    def _ring(self, centre: Position, radius: int):
+        # cells exactly ``radius`` cells away, clipped to the occupied bounds
+        cx, cy = centre
+        min_x, max_x, min_y, max_y = self.bounds
+        xs = range(max(cx - radius, min_x), min(cx + radius, max_x) + 1)
+        for y in {cy - radius, cy + radius}:
+            if min_y <= y <= max_y:
+                yield from ((x, y) for x in xs)
+        for x in {cx - radius, cx + radius}:
+            if min_x <= x <= max_x:
+                yield from ((x, y) for y in range(max(cy - radius + 1, min_y), min(cy + radius - 1, max_y) + 1))
+
+    def k_nearest(self, origin: Position, k: int) -> list[dict]:
+        if not self.tiles or k <= 0:
+            return []
+        if len(self.tiles) <= self.SCAN_LIMIT:
+            return sorted(self.tiles, key=lambda t: (distance(origin, (t["x"], t["y"])), t["x"], t["y"]))[:k]
+        centre = self._cell(*origin)
+        min_x, max_x, min_y, max_y = self.bounds
+        # rings inside first_ring are empty, beyond last_ring every cell lies outside the occupied bounds
+        first_ring = max(min_x - centre[0], centre[0] - max_x, min_y - centre[1], centre[1] - max_y, 0)
+        last_ring = max(abs(centre[0] - min_x), abs(centre[0] - max_x), abs(centre[1] - min_y), abs(centre[1] - max_y))
+        found = []
+        for radius in itertools.count(first_ring):
+            for cell in self._ring(centre, radius):
+                found.extend((distance(origin, (t["x"], t["y"])), t["x"], t["y"], t) for t in self.buckets.get(cell, ()))
+            # anything in ring r + 1 is at least r * cell + 1 tiles away
+            if len(found) >= k:
+                found.sort(key=lambda entry: entry[:3])
+                if found[k - 1][0] <= radius * self.cell or radius >= last_ring:
+                    break
+            elif radius >= last_ring:
+                found.sort(key=lambda entry: entry[:3])
+                break
+        return [entry[3] for entry in found[:k]]
+
+
+class SpatialIndex:
+    """Nearest-tile queries over the map, per content code and per content type.
+
+    Each code and type gets its own grid, so a query only ever looks at matching tiles
+    and stops as soon as no closer one can exist. Distances are in tiles, which is what
+    a move costs.
+    """
+
+    CELL = 4
+
+    def __init__(self, tiles: list[dict]):
+        self.by_position: dict[Position, dict] = {(tile["x"], tile["y"]): tile for tile in tiles}
+        occupied = [tile for tile in tiles if tile["content"]]
+        by_content, by_type = defaultdict(list), defaultdict(list)
+        for tile in occupied:
+            by_content[tile["content"]["code"]].append(tile)
+            by_type[tile["content"]["type"]].append(tile)
+        self.grids = {
+            **{("content", code): _Grid(group, self.CELL) for code, group in by_content.items()},
+            **{("type", content_type): _Grid(group, self.CELL) for content_type, group in by_type.items()},
+            ("any", None): _Grid(occupied, self.CELL)
+        }
+
+    def _grid(self, content: str | None, content_type: str | None) -> _Grid | None:
+        if content:
+            return self.grids.get(("content", content))
+        if content_type:
+            return self.grids.get(("type", content_type))
+        return self.grids[("any", None)]
+
+    def at(self, position: Position) -> dict | None:
+        return self.by_position.get(tuple(position))
+
+    def tiles(self, content: str | None = None, content_type: str | None = None) -> list[dict]:
+        grid = self._grid(content, content_type)
+        return grid.tiles if grid else []
+
+    def nearest(self, origin: Position, content: str | None = None, content_type: str | None = None) -> dict | None:
+        """Closest tile holding ``content`` (a code) or ``content_type``, ties broken by coordinates."""
+        found = self.k_nearest(origin, 1, content=content, content_type=content_type)
+        return found[0] if found else None
+
+    def k_nearest(self, origin: Position, k: int, content: str | None = None,
+                  content_type: str | None = None) -> list[dict]:
+        grid = self._grid(content, content_type)
+        return grid.k_nearest(tuple(origin), k) if grid else []
+
+    @staticmethod
+    def distance_matrix(origins: list[Position], targets: list[Position]) -> np.ndarray:
+        """Tiles between every origin (rows) and every target (columns)."""
+        a = np.asarray(origins, dtype=np.int64).reshape(-1, 2)
+        b = np.asarray(targets, dtype=np.int64).reshape(-1, 2)
+        return np.abs(a[:, None, :] - b[None, :, :]).sum(axis=2)
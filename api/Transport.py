@@ -0,0 +1,194 @@
+import asyncio
+import copy
+import gzip
+import json
+import os
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from api.Clock import Clock
+
+
+class Transport:
+    """Pooled keep-alive HTTP client shared by every character.
+
+    aiohttp sessions are bound to the event loop they were created in, so the
+    session is (re)created lazily for whichever loop is currently running.
+    """
+
+    def __init__(self, headers: dict, pool_size: int = 100, timeout: float = 30):
+        self.headers = headers
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=self.timeout)
+            self._loop = loop
+        return self._session
+
+    async def post(self, url: str, data: dict | list | None = None) -> dict:
+        async with self.session.post(url, data=json.dumps(data if data is not None else dict())) as response:
+            return await response.json(content_type=None)
+
+    async def get(self, url: str) -> dict:
+        async with self.session.get(url) as response:
+            return await response.json(content_type=None)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+def _request_key(method: str, url: str, data: dict | list | None = None) -> str:
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return f"{method} {path} {json.dumps(data, sort_keys=True, separators=(',', ':'))}" if data else f"{method} {path}"
+
+
+class RecordingTransport(Transport):
+    """Transport that also writes every request and its response to a gzipped JSON lines file.
+
+    Each record is appended and flushed as soon as its response arrives, so a run that
+    crashes or is killed still leaves everything up to that point on disk. Closing the
+    session writes a marker of how long the recording has run; the next request appends
+    to the same file, so one file can span the catalog download and the run after it.
+    """
+
+    def __init__(self, headers: dict, path: str, clock: Clock | None = None, **kwargs):
+        super().__init__(headers, **kwargs)
+        self.path = path
+        self.clock = clock or Clock()
+        self.started = self.clock.monotonic()
+        self._file = None
+        self._mode = "wt"
+
+    def _write(self, record: dict):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = gzip.open(self.path, self._mode, encoding="utf-8")
+            self._mode = "at"
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def _record(self, key: str, sent: float, response: dict):
+        self._write({
+            "t": round(sent - self.started, 3),
+            "l": round(self.clock.monotonic() - sent, 4),
+            "k": key,
+            "r": response
+        })
+
+    async def post(self, url: str, data: dict | list | None = None) -> dict:
+        sent = self.clock.monotonic()
+        response = await super().post(url, data)
+        self._record(_request_key("POST", url, data), sent, response)
+        return response
+
+    async def get(self, url: str) -> dict:
+        sent = self.clock.monotonic()
+        response = await super().get(url)
+        self._record(_request_key("GET", url), sent, response)
+        return response
+
+    def flush(self):
+        """Mark how long the recording has run and close the file until the next request."""
+        if self._file is None:
+            return
+        self._write({"t": round(self.clock.monotonic() - self.started, 3), "end": True})
+        self._file.close()
+        self._file = None
+
+    async def close(self):
+        await super().close()
+        self.flush()
+
+
+class ReplayMiss(LookupError):
+    pass
+
+
+class ReplayTransport(Transport):
+    """Serves a recording back without touching the network.
+
+    Every distinct request gets its recorded responses in order; asked more often than
+    recorded, it keeps getting the last one, which ``stats`` counts as reused. A request
+    that was never recorded raises ``ReplayMiss``, meaning the recording is out of date.
+    Latency is replayed scaled by ``latency_scale`` and cooldowns by ``cooldown_scale``;
+    pair it with a VirtualClock to skip cooldowns altogether.
+    """
+
+    def __init__(self, headers: dict, path: str, latency_scale: float = 0.0, cooldown_scale: float = 1.0,
+                 **kwargs):
+        super().__init__(headers, **kwargs)
+        self.path = path
+        self.latency_scale = latency_scale
+        self.cooldown_scale = cooldown_scale
+        self.responses: dict[str, deque[tuple[float, dict]]] = defaultdict(deque)
+        # seconds the recorded run lasted
+        self.duration = 0.0
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            try:
+                for line in file:
+                    record = json.loads(line)
+                    self.duration = max(self.duration, record["t"])
+                    if "end" not in record:
+                        self.responses[record["k"]].append((record["l"], record["r"]))
+            except EOFError:
+                # the recording process died, every record flushed before that is intact
+                pass
+        self.last: dict[str, tuple[float, dict]] = {}
+        self.served = 0
+        self.reused: dict[str, int] = defaultdict(int)
+
+    def _scaled(self, response: dict) -> dict:
+        data = response.get("data") if isinstance(response, dict) else None
+        cooldown = data.get("cooldown") if isinstance(data, dict) else None
+        if self.cooldown_scale == 1 or not isinstance(cooldown, dict):
+            return response
+        cooldown = {
+            **cooldown,
+            **{key: cooldown[key] * self.cooldown_scale for key in ("total_seconds", "remaining_seconds")
+               if key in cooldown}
+        }
+        return {**response, "data": {**data, "cooldown": cooldown}}
+
+    async def _replay(self, method: str, url: str, data=None) -> dict:
+        key = _request_key(method, url, data)
+        if recorded := self.responses.get(key):
+            latency, response = self.last[key] = recorded.popleft()
+        elif key in self.last:
+            latency, response = self.last[key]
+            self.reused[key] += 1
+        else:
+            raise ReplayMiss(f"{key} is not in {self.path}")
+        self.served += 1
+        if self.latency_scale:
+            await asyncio.sleep(latency * self.latency_scale)
+        return self._scaled(copy.deepcopy(response))
+
+    async def post(self, url: str, data: dict | list | None = None) -> dict:
+        return await self._replay("POST", url, data)
+
+    async def get(self, url: str) -> dict:
+        return await self._replay("GET", url)
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.served,
+            "reused": sum(self.reused.values()),
+            "unused": sum(len(recorded) for recorded in self.responses.values()),
+            "reused_by_request": dict(self.reused)
+        }
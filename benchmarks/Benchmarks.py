@@ -0,0 +1,245 @@
+"""Micro-benchmarks of the hot paths on the pinned catalog and character fixtures.
+
+    python -m benchmarks.Benchmarks                 # compare against benchmarks/baseline.json
+    python -m benchmarks.Benchmarks --save          # record a new baseline
+    python -m benchmarks.Benchmarks -k will_win     # only matching benchmarks
+
+The client loads its catalogs from an in-process mock server and every character comes from
+``fixtures/characters.json``, so nothing touches the network while timing. A benchmark
+regresses when its median ops/sec fall, or its allocations grow, by more than the tolerance.
+The baseline records the machine and settings it was taken with; against a baseline from a
+different machine or with different settings the changes are shown but nothing fails.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import socket
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+from mock.MockServer import FIXTURE, MockServer, load_catalog
+from mock.Simulation import serve_in_thread
+
+DIRECTORY = os.path.dirname(__file__)
+CHARACTERS = os.path.join(DIRECTORY, "fixtures", "characters.json")
+BASELINE = os.path.join(DIRECTORY, "baseline.json")
+# baseline key of the machine and settings the results were taken with, never a benchmark name
+META = "_meta"
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable
+    # coroutine functions are awaited in batches on one event loop
+    is_async: bool = False
+
+
+@dataclass
+class Result:
+    name: str
+    ops_per_second: float
+    alloc_kib: float
+
+    def row(self) -> dict:
+        return {"ops_per_second": round(self.ops_per_second, 1), "alloc_kib": round(self.alloc_kib, 1)}
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("localhost", 0))
+        return probe.getsockname()[1]
+
+
+def _client():
+    """The API client, with catalogs from the pinned fixture and characters from the fixture file."""
+    port = _free_port()
+    serve_in_thread(MockServer(load_catalog(FIXTURE)), port=port)
+    os.environ["API_ROOT_URL"] = f"http://localhost:{port}"
+
+    from api.ArtifactsAPI import ArtifactsAPI
+    # the fixture catalog must not replace the real game's cached snapshot
+    with tempfile.TemporaryDirectory() as cache:
+        ArtifactsAPI.initialize(refresh_catalogs=True, catalog_cache_path=os.path.join(cache, "catalog.pickle"))
+    client = ArtifactsAPI.instance()
+    with open(CHARACTERS, encoding="utf-8") as file:
+        client.characters.load(json.load(file))
+    return client
+
+
+def benchmarks() -> list[Benchmark]:
+    client = _client()
+
+    from CombatSimulator import Analytic
+    from CombatSimulator.CombatSimulator import CombatSimulator
+    from character.Character import Character
+    from character.Tasks import FightTask
+    from characters import characters
+
+    name = characters[0].name
+    data = client.characters.get(name)
+    character = Character(name, data)
+    fight = FightTask(characters[0], 1, "wolf")
+    monte_carlo = CombatSimulator(character, "wolf")
+    analytic = CombatSimulator(character, "wolf", engine="analytic")
+
+    def cold(func: Callable) -> Callable:
+        # the analytic solver memoizes every fight, time real solves rather than cache hits
+        def run():
+            Analytic.solve.cache_clear()
+            Analytic.strike_series.cache_clear()
+            return func()
+
+        return run
+
+    return [
+        Benchmark("get_item_location[monster drop]", lambda: client.get_item_location("feather")),
+        Benchmark("get_item_location[resource]", lambda: client.get_item_location("copper_ore")),
+        Benchmark("get_item_location[craft]", lambda: client.get_item_location("steel_helm")),
+        Benchmark("get_item", lambda: client.get_item("iron_helm")),
+        Benchmark("FightTask.choose_best_weapon", fight.choose_best_weapon, is_async=True),
+        Benchmark("CombatSimulator.will_win[monte_carlo]", monte_carlo.will_win),
+        Benchmark("CombatSimulator.will_win[analytic]", cold(analytic.will_win)),
+        Benchmark("CombatSimulator.get_necessary_equipment", cold(monte_carlo.get_necessary_equipment)),
+        Benchmark("Character.__init__", lambda: Character(name, data)),
+        Benchmark("Character.get_naked_character", character.get_naked_character),
+    ]
+
+
+def _timer(benchmark: Benchmark, loop: asyncio.AbstractEventLoop) -> Callable[[int], float]:
+    if benchmark.is_async:
+        async def batch(calls):
+            started = time.perf_counter()
+            for _ in range(calls):
+                await benchmark.func()
+            return time.perf_counter() - started
+
+        return lambda calls: loop.run_until_complete(batch(calls))
+
+    def run(calls):
+        func = benchmark.func
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        return time.perf_counter() - started
+
+    return run
+
+
+def environment(min_time: float, rounds: int) -> dict:
+    """What timings depend on besides the code, stored with a baseline to tell whether a run is comparable."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "min_time": min_time,
+        "rounds": rounds
+    }
+
+
+def measure(benchmark: Benchmark, loop: asyncio.AbstractEventLoop, min_time: float = 0.2,
+            rounds: int = 9) -> Result:
+    """Median of ``rounds`` timed batches, each sized to last about ``min_time``, then allocations of one call."""
+    timer = _timer(benchmark, loop)
+    calls = 1
+    while (elapsed := timer(calls)) < min_time / 10:
+        calls *= 10
+    calls = max(1, int(calls * min_time / max(elapsed, 1e-9)))
+    gc.collect()
+    # the median shrugs off a batch slowed by another process, a single best batch does not repeat
+    median = statistics.median(timer(calls) for _ in range(rounds)) / calls
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        timer(1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(benchmark.name, 1 / median, (peak - before) / 1024)
+
+
+def compare(results: list[Result], baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for result in results:
+        if (previous := baseline.get(result.name)) is None:
+            continue
+        if result.ops_per_second < previous["ops_per_second"] * (1 - tolerance):
+            regressions.append(f"{result.name}: {result.ops_per_second:,.1f} ops/s, "
+                               f"baseline {previous['ops_per_second']:,.1f}")
+        # allocations below a KiB are noise
+        if result.alloc_kib > max(previous["alloc_kib"] * (1 + tolerance), previous["alloc_kib"] + 1):
+            regressions.append(f"{result.name}: {result.alloc_kib:,.1f} KiB allocated, "
+                               f"baseline {previous['alloc_kib']:,.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the hot paths")
+    parser.add_argument("-k", dest="filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown or allocation growth")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed round")
+    parser.add_argument("--rounds", type=int, default=9, help="timed rounds, the median is kept")
+    args = parser.parse_args()
+
+    try:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        baseline = {}
+    current = environment(args.min_time, args.rounds)
+    recorded = baseline.get(META, {})
+    differences = {key: (recorded.get(key), value) for key, value in current.items() if recorded.get(key) != value}
+    if differences:
+        print("The baseline was taken on another machine or with other settings, not failing on changes:")
+        for key, (then, now) in differences.items():
+            print(f"  {key}: {then} -> {now}")
+
+    loop = asyncio.new_event_loop()
+    results = []
+    print(f"{'benchmark':45} {'ops/s':>14} {'baseline':>14} {'change':>8} {'KiB/op':>10}")
+    for benchmark in benchmarks():
+        if args.filter and args.filter not in benchmark.name:
+            continue
+        result = measure(benchmark, loop, args.min_time, args.rounds)
+        results.append(result)
+        previous = baseline.get(result.name, {}).get("ops_per_second")
+        change = f"{result.ops_per_second / previous - 1:+.0%}" if previous else ""
+        print(f"{result.name:45} {result.ops_per_second:>14,.1f} {f'{previous:,.1f}' if previous else '':>14} "
+              f"{change:>8} {result.alloc_kib:>10,.1f}")
+    loop.close()
+
+    if args.save:
+        # results taken elsewhere are not mixed into this baseline
+        if differences:
+            baseline = {}
+        baseline.update({META: current, **{result.name: result.row() for result in results}})
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return
+    if differences:
+        return
+    if regressions := compare(results, baseline, args.tolerance):
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
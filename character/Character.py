@@ -131,9 +131,14 @@ class Character:
     equipment: Equipment
     quest: Quest
 
-    def __init__(self, name):
+    def __init__(self, name, data=None):
+        """Built from ``data``, else the character mirror, else a fresh fetch.
+
+        The fetch blocks, so it only happens outside a running event loop, as in scripts and
+        the REPL; a coroutine that may find the mirror cold uses ``await Character.load(name)``.
+        """
         self.client: ArtifactsAPI = ArtifactsAPI.instance()
-        data = self.client.get_characters_data(name)
+        data = data or self.client.characters.get(name) or self._fetch(name)
         self.name = data['name']
         self.skin = data['skin']
         self.xp = XpMeter(data['xp'], data['max_xp'], data['level'])
@@ -156,6 +161,25 @@ class Character:
                                    [parse_item(self.client.get_item(item['code'])) for item in data['inventory'] if
                                     item['code']])
 
+    @classmethod
+    async def load(cls, name):
+        return cls(name, await ArtifactsAPI.instance().get_characters_data(name))
+
+    def _fetch(self, name):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._fetch_and_close(name))
+        # asyncio.run cannot nest and blocking here would stall every other character
+        raise LookupError(f"{name} is not in the character mirror yet, use `await Character.load(name)`")
+
+    async def _fetch_and_close(self, name):
+        try:
+            return await self.client.get_characters_data(name)
+        finally:
+            # the session belongs to this short-lived loop
+            await self.client.transport.close()
+
     @task
     def pick_best_fit_for_location(self):
         pass
@@ -175,7 +199,8 @@ class Character:
         return Equipment(**slots)
 
     def get_naked_character(self):
-        character = deepcopy(self)
+        # share the API client instead of copying its session and catalog
+        character = deepcopy(self, {id(self.client): self.client})
         additional_hp = 0
         for slot, item in character.equipment:
             if item:
@@ -228,7 +253,6 @@ class Character:
         return False
 
     def _virtual_equip_item(self, item: Item):
-        self.client.equip(self.name, item.code)
         setattr(self.equipment, item.type + '_slot', item)
         self._apply_effects(item, apply=True)
 
@@ -236,6 +260,7 @@ class Character:
         item = getattr(self.equipment, slot)
         if item:
             self._apply_effects(item, apply=False)
+            setattr(self.equipment, slot, None)
 
     def equip_item(self, item: Item, virtual=True):
         if virtual:
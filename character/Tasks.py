@@ -1,26 +1,46 @@
 from __future__ import annotations
 
 from abc import ABC
+from collections import defaultdict
 
+from CombatSimulator.CombatSimulator import CombatSimulator
+from CombatSimulator.Workers import CombatWorkerPool
 from api.ArtifactsAPI import ArtifactsAPI
+from character.Character import Character
 from characters import TMPCharacter
+from monitoring.Metrics import current_task
+from planner.AcquisitionCost import AcquisitionCostModel
+from planner.RecipePlanner import CraftingPlan, RecipePlanner
 from utils import Locations, Slots
 
 
 class Task(ABC):
-    location: Locations | None
     item: str | None
     quantity: int
     monster: dict | None
-    client: ArtifactsAPI = ArtifactsAPI.instance()
     character: TMPCharacter
 
     def __init__(self, character: TMPCharacter, quantity, item=None):
-        if item:
-            self.location = self.client.get_item_location(item)
+        self.character: TMPCharacter = character
+        self._location: Locations | None = None
         self.item = item
         self.quantity = quantity
-        self.character: TMPCharacter = character
+
+    @property
+    def client(self) -> ArtifactsAPI:
+        # looked up on use: importing the tasks, as spawned worker processes do, must not connect
+        return ArtifactsAPI.instance()
+
+    @property
+    def location(self) -> Locations | None:
+        # where to get the item is decided on first use, from the character's state by then
+        if self._location is None and self.item:
+            self._location = self._source_location(self.character, self.item)
+        return self._location
+
+    @location.setter
+    def location(self, location: Locations | None):
+        self._location = location
 
     def __init_subclass__(cls, **kwargs):
         orig_init = cls.__init__
@@ -31,28 +51,49 @@ class Task(ABC):
                 f'[{self.character.name}]'
                 f' {self.__class__.__name__} created'
                 f' "get" {self.quantity} of {self.item}'
-                f' {self.location.name} {self.location.value}'
+                + (f' {self._location.name} {self._location.value}' if self._location else '')
             )
 
         cls.__init__ = new_init
+        orig_call = cls.__call__
+
+        async def new_call(self, *args, **kwargs):
+            # actions sent from here on are credited to this task
+            token = current_task.set(self)
+            started = self.client.clock.monotonic()
+            try:
+                return await orig_call(self, *args, **kwargs)
+            finally:
+                current_task.reset(token)
+                self.client.metrics.record_task(self, self.client.clock.monotonic() - started)
+
+        cls.__call__ = new_call
 
     async def __call__(self):
-        await self.client.move(self.character.name, *self.location.value)
+        return await self.client.move(self.character.name, *self.location.value)
+
+    def _position(self) -> tuple[int, int]:
+        data = self.client.characters.get(self.character.name)
+        return (data["x"], data["y"]) if data is not None else Locations.BANK.value
+
+    def _source_location(self, character: TMPCharacter, item: str):
+        # the cheapest place to farm the item for this character, first known source otherwise
+        if (data := self.client.characters.get(character.name)) is not None:
+            costs = AcquisitionCostModel.for_character(self.client.catalog, Character(character.name, data))
+            if source := costs.cheapest(item, kinds=("monster", "resource")):
+                return self.client.tile_location(source.tile)
+        return self.client.get_item_location(item, self._position())
 
     def __del__(self):
         print(
-            f'[{self.character.name}] | {self.__class__.__name__} | {self.item} | {self.quantity} | {self.location} finished')
+            f'[{self.character.name}] | {self.__class__.__name__} | {self.item} | {self.quantity} | {self._location} finished')
 
-    def _get_collected_amount(self, item=None):
-        try:
-            items = self.client.get_char_inventory(self.character.name)
-            collected = next(filter(lambda i: i["code"] == (self.item if not item else item), items))["quantity"]
-        except:
-            collected = 0
-        return collected
+    async def _get_collected_amount(self, item=None):
+        await self.client.get_characters_data(self.character.name)
+        return self.client.characters.quantity(self.character.name, item or self.item)
 
     async def _switch_item(self, slot: Slots, item: str):
-        already_equipped = self.client.get_characters_data(self.character.name)[slot.value + "_slot"] == item
+        already_equipped = (await self.client.get_characters_data(self.character.name))[slot.value + "_slot"] == item
         if not already_equipped:
             await self.client.unequip(self.character.name, slot=slot)
             await self.client.equip(self.character.name, item, slot=slot)
@@ -61,54 +102,58 @@ class Task(ABC):
 class GatherTask(Task):
     def __init__(self, character: TMPCharacter, quantity, item):
         super().__init__(character, quantity, item=item)
-        self.collected = self._get_collected_amount(item=self.item)
-        self.quantity = self.collected + quantity
+        self.collected = 0
         self.monster = None
 
     async def __call__(self):
         await super().__call__()
-        with open(f"logs/{self.character.name}.log", "a", encoding="utf-8") as logfile:
-            logfile.write(
-                f'{self.character.name} starts {self.__class__.__name__} | location: {self.location.name} | item: {self.item}\n')
-            while self.collected < self.quantity:
-                cell_data = self.client.get_map_cell(self.location)["data"]
-                if pillage := cell_data["content"]["type"] == "monster":
-                    if not self.monster:
-                        self.monster = self.client.get_monster_by_code(cell_data["content"]["code"])
-                    await self.equip_best_weapon()
-                    result = await self.client.fight(self.character.name)
-                    if "497" in str(result):
-                        await DepositTask(self.character)()
-                        await self.client.move(self.character.name, *self.location.value)
-                    try:
-                        if result["data"]["fight"]["result"] == "lose":
-                            # skipping task
-                            return
-                    except Exception as e:
-                        logfile.write(f"!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!{str(result)}")
-
-                else:
-                    if self.character.tools:
-                        subtype = self.client.get_item(self.item)["subtype"]
-                        tool = self.character.tools.get(subtype)
-                        if tool:
-                            await self._switch_item(slot=Slots.WEAPON, item=tool)
-                    await self.client.gather_resource(self.character.name)
-                logfile.write(f'    {"Pillaged" if pillage else "Gathered"} {self.collected}/{self.quantity}\n')
-                self.collected = self._get_collected_amount(item=self.item)
-            self.collected = 0
+        self.collected = await self._get_collected_amount(item=self.item)
+        goal = self.collected + self.quantity
+        self.client.events.log(
+            self.character.name,
+            f'{self.character.name} starts {self.__class__.__name__} | location: {self.location.name} | item: {self.item}',
+            task=self.__class__.__name__, item=self.item, quantity=self.quantity
+        )
+        while self.collected < goal:
+            cell_data = (await self.client.get_map_cell(self.location))["data"]
+            if pillage := cell_data["content"]["type"] == "monster":
+                if not self.monster:
+                    self.monster = self.client.get_monster_by_code(cell_data["content"]["code"])
+                await self.equip_best_weapon()
+                result = await self.client.fight(self.character.name)
+                if "497" in str(result):
+                    await DepositTask(self.character)()
+                    await self.client.move(self.character.name, *self.location.value)
+                try:
+                    if result["data"]["fight"]["result"] == "lose":
+                        # skipping task
+                        return
+                except Exception as e:
+                    self.client.events.log(self.character.name, f"!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!{str(result)}")
+
+            else:
+                if self.character.tools:
+                    subtype = self.client.get_item(self.item)["subtype"]
+                    tool = self.character.tools.get(subtype)
+                    if tool:
+                        await self._switch_item(slot=Slots.WEAPON, item=tool)
+                await self.client.gather_resource(self.character.name)
+            self.client.events.log(self.character.name, f'    {"Pillaged" if pillage else "Gathered"} {self.collected}/{goal}')
+            self.collected = await self._get_collected_amount(item=self.item)
+        self.collected = 0
 
     async def equip_best_weapon(self):
-        await self._switch_item(Slots.WEAPON, self.choose_best_weapon().get("code"))
+        await self._switch_item(Slots.WEAPON, (await self.choose_best_weapon()).get("code"))
 
-    def choose_best_weapon(self):
-        all_weapons = list(filter(lambda i: "weapon" in str(i), self.client.items))
-        weapon_codes_in_inventory = [weapon["code"] for weapon in self.client.get_char_inventory(self.character.name)]
+    async def choose_best_weapon(self):
+        all_weapons = self.client.catalog.items_by_type["weapon"]
+        weapon_codes_in_inventory = {weapon["code"] for weapon in await self.client.get_char_inventory(self.character.name)}
         weapon_in_inventory = list(filter(lambda w: w["code"] in weapon_codes_in_inventory, all_weapons))
         try:
-            equipped_weapon = self.client.get_item(self.client.get_characters_data(self.character.name)["weapon_slot"])
+            equipped_weapon = self.client.get_item(
+                (await self.client.get_characters_data(self.character.name))["weapon_slot"])
             weapon_in_inventory.append(equipped_weapon)
-        except StopIteration:
+        except KeyError:
             pass
 
         best_weapon = None
@@ -133,6 +178,8 @@ class GatherTask(Task):
 
 
 class CraftingTask(Task):
+    _planner: RecipePlanner | None = None
+
     def __init__(
             self,
             character: TMPCharacter,
@@ -140,75 +187,95 @@ class CraftingTask(Task):
             item,
     ):
         super().__init__(character, quantity, item=item)
-        self.location = self.client.get_item_location(item)
+        self.location = self.client.get_nearest_location(self._position(), content=self.planner.recipe(item).skill)
+
+    @property
+    def planner(self) -> RecipePlanner:
+        # one planner, and its recipe cache, shared by every crafting task on the same catalog
+        if CraftingTask._planner is None or CraftingTask._planner.catalog is not self.client.catalog:
+            CraftingTask._planner = RecipePlanner(self.client.catalog)
+        return CraftingTask._planner
+
+    async def make_plan(self) -> CraftingPlan:
+        name = self.character.name
+        await self.client.get_characters_data(name)
+        await self.client.get_bank_items()
+        inventory = defaultdict(int)
+        for slot in self.client.characters.inventory(name):
+            inventory[slot["code"]] += slot["quantity"]
+        targets = {self.item: self.quantity}
+        bank = {code: self.client.bank.available(code, owner=name) for code in self.planner.topological_order(targets)}
+        plan = self.planner.plan(targets, inventory, bank)
+        for code, quantity in plan.withdrawals.items():
+            self.client.bank.reserve(name, code, quantity)
+        return plan
 
     async def __call__(self):
-        # prep for crafting
-        recipie = {craft_item["code"]: craft_item["quantity"] for craft_item in self.client.get_item_recipie(self.item)}
-        items_to_get_from_bank = dict()
-        items_to_get_otherwise = dict()
-        for item in recipie:
-            if (collected := self._get_collected_amount(item=item)) < (recipie[item] * self.quantity):
-                required = recipie[item] * self.quantity - collected
-                try:
-                    left_in_bank = {item["code"]: item["quantity"] for item in self.client.get_bank_items()}[item]
-                except KeyError:
-                    left_in_bank = 0
-                if left_in_bank >= required:
-                    items_to_get_from_bank.update({item: required})
-                else:
-                    if left_in_bank:
-                        items_to_get_from_bank.update({item: left_in_bank})
-                    if required - left_in_bank > 0:
-                        items_to_get_otherwise.update({item: required - left_in_bank})
-        if items_to_get_from_bank:
-            await RetrieveFromBankTask(self.character, **items_to_get_from_bank)()
-        preceding_tasks = []
-        for item in items_to_get_otherwise:
-            if not self.client.get_item_recipie(item):
-                preceding_tasks.append(GatherTask(self.character, items_to_get_otherwise[item], item))
-            else:
-                preceding_tasks.append(CraftingTask(self.character, items_to_get_otherwise[item], item))
-        for preceding_task in preceding_tasks:
-            await preceding_task()
-        # crafting itself
-        await super().__call__()
-        response = await self.client.craft(self.character.name, qtt=self.quantity, code=self.item)
-        with open(f"logs/{self.character.name}.log", "a", encoding="utf-8") as logfile:
-            if "insufficient" in str(response):
-                logfile.write(f"    Craft skipped, insufficient resources\n")
-            else:
-                logfile.write(f"    Crafted {self.quantity} {self.item}\n")
+        plan = await self.make_plan()
+        self.client.events.log(self.character.name, f"    Plan for {self.quantity} {self.item}: {plan}",
+                               task=self.__class__.__name__, item=self.item, quantity=self.quantity)
+        if plan.withdrawals:
+            await RetrieveFromBankTask(self.character, **plan.withdrawals)()
+        for item, quantity in plan.gathers.items():
+            await GatherTask(self.character, quantity, item)()
+        for step in plan.crafts:
+            workshop = self.client.get_nearest_location(self._position(), content=step.skill)
+            await self.client.move(self.character.name, *workshop.value)
+            response = await self.client.craft(self.character.name, qtt=step.crafts, code=step.code)
+            if "error" in response:
+                self.client.events.log(self.character.name, f"    Craft of {step.code} skipped, insufficient resources")
+                return
+            self.client.events.log(self.character.name, f"    Crafted {step.units} {step.code}")
 
 
 class FightTask(Task):
     progress: int = 0
+    # the loadout search runs on the event loop when there is no worker pool, keep it short
+    LOADOUT_TIME_BUDGET = 0.5
 
-    def __init__(self, character: TMPCharacter, quantity, monster_code):
+    def __init__(self, character: TMPCharacter, quantity, monster_code, pool: CombatWorkerPool | None = None):
         super().__init__(character, quantity)
         self.monster = self.client.get_monster_by_code(monster_code)
-        self.location = self.client.get_location_by_monster(monster_code)
+        self.location = self.client.get_location_by_monster(monster_code, self._position())
+        self.pool = pool
 
     async def __call__(self):
         await super().__call__()
-        await self.equip_best_weapon()
-        with open(f"logs/{self.character.name}.log", "a", encoding="utf-8") as logfile:
-            for i in range(self.quantity):
-                result = await self.client.fight(self.character.name)
-                if "497" in str(result):
-                    await DepositTask(self.character)()
-                self.progress += 1
-                logfile.write(f'    Killed {self.progress}/{self.quantity}')
+        await self.equip_best_loadout()
+        for i in range(self.quantity):
+            result = await self.client.fight(self.character.name)
+            if "497" in str(result):
+                await DepositTask(self.character)()
+            self.progress += 1
+            self.client.events.log(self.character.name, f'    Killed {self.progress}/{self.quantity}')
         self.progress = 0
 
+    async def equip_best_loadout(self):
+        """Wears the best combination of what the character carries against the monster."""
+        name = self.character.name
+        data = await self.client.get_characters_data(name)
+        # a simulated clock must not run on while the worker pool is searching
+        with self.client.clock.busy():
+            loadout = await CombatSimulator(Character(name, data), self.monster).get_best_loadout_async(
+                self.pool, time_budget=self.LOADOUT_TIME_BUDGET, include_bank=False, include_craftable=False
+            )
+        changes = {slot: code for slot, code in loadout.items.items() if code and data[slot] != code}
+        # free every slot first, an item may only be moving from one ring or artifact slot to another
+        for slot in changes:
+            if data[slot]:
+                await self.client.unequip(name, slot=Slots(slot.removesuffix("_slot")))
+        for slot, code in changes.items():
+            await self.client.equip(name, code, slot=Slots(slot.removesuffix("_slot")))
+
     async def equip_best_weapon(self):
-        await self._switch_item(Slots.WEAPON, self.choose_best_weapon().get("code"))
+        await self._switch_item(Slots.WEAPON, (await self.choose_best_weapon()).get("code"))
 
-    def choose_best_weapon(self):
-        all_weapons = list(filter(lambda i: "weapon" in str(i), self.client.items))
-        weapon_codes_in_inventory = [weapon["code"] for weapon in self.client.get_char_inventory(self.character.name)]
+    async def choose_best_weapon(self):
+        all_weapons = self.client.catalog.items_by_type["weapon"]
+        weapon_codes_in_inventory = {weapon["code"] for weapon in await self.client.get_char_inventory(self.character.name)}
         weapon_in_inventory = list(filter(lambda w: w["code"] in weapon_codes_in_inventory, all_weapons))
-        equipped_weapon = self.client.get_item(self.client.get_characters_data(self.character.name)["weapon_slot"])
+        equipped_weapon = self.client.get_item(
+            (await self.client.get_characters_data(self.character.name))["weapon_slot"])
         weapon_in_inventory.append(equipped_weapon)
 
         best_weapon = None
@@ -235,31 +302,46 @@ class FightTask(Task):
 class DepositTask(Task):
     def __init__(self, character: TMPCharacter):
         super().__init__(character, 0)
-        self.location = Locations.BANK
+        self.location = self.client.get_nearest_location(self._position(), content_type="bank")
+        self.kept_items = set(self.character.persistent_inventory or []) | set(self.character.tools.values())
+        self.last_trip: dict | None = None
+
+    async def plan(self) -> dict[str, int]:
+        deposits = defaultdict(int)
+        for slot in await self.client.get_char_inventory(self.character.name):
+            if slot["code"] and slot["quantity"] and slot["code"] not in self.kept_items:
+                deposits[slot["code"]] += slot["quantity"]
+        return deposits
 
     async def __call__(self):
-        await super().__call__()
-        with open(f"logs/{self.character.name}.log", "a", encoding="utf-8") as logfile:
-            inventory_item_codes = [item["code"] for item in self.client.get_char_inventory(self.character.name)]
-            for item in inventory_item_codes:
-                if item in self.character.persistent_inventory + list(self.character.tools.values()):
-                    continue
-                amount = self._get_collected_amount(item=item)
-                if not amount:
-                    continue
-                await self.client.deposit_item_in_bank(self.character.name, item, amount)
-                logfile.write(f"    Deposited {amount} {item}\n")
+        deposits = await self.plan()
+        if not deposits:
+            return
+        started = self.client.clock.monotonic()
+        move = await super().__call__()
+        cooldown = 0 if "error" in move else move["data"]["cooldown"]["total_seconds"]
+        for item, amount in deposits.items():
+            result = await self.client.deposit_item_in_bank(self.character.name, item, amount)
+            if "error" not in result:
+                cooldown += result["data"]["cooldown"]["total_seconds"]
+                self.client.events.log(self.character.name, f"    Deposited {amount} {item}")
+        self.last_trip = {
+            "deposits": len(deposits),
+            "items": sum(deposits.values()),
+            "cooldown_seconds": round(cooldown, 2),
+            "wall_seconds": round(self.client.clock.monotonic() - started, 2)
+        }
+        self.client.events.log(self.character.name, f"    Bank trip: {self.last_trip}", bank_trip=self.last_trip)
 
 
 class RetrieveFromBankTask(Task):
     def __init__(self, character: TMPCharacter, **items):
         super().__init__(character, 0)
-        self.location = Locations.BANK
+        self.location = self.client.get_nearest_location(self._position(), content_type="bank")
         self.items = items
 
     async def __call__(self):
         await super().__call__()
-        with open(f"logs/{self.character.name}.log", "a", encoding="utf-8") as logfile:
-            for item in self.items:
-                await self.client.retrieve_item_from_bank(self.character.name, item, self.items[item])
-                logfile.write(f"    Deposited {item} {self.items[item]}\n")
+        for item in self.items:
+            await self.client.retrieve_item_from_bank(self.character.name, item, self.items[item])
+            self.client.events.log(self.character.name, f"    Withdrew {self.items[item]} {item}")
@@ -0,0 +1,247 @@
+import asyncio
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import count
+
+from CombatSimulator.Workers import CombatWorkerPool
+from api.ArtifactsAPI import ArtifactsAPI
+from api.SpatialIndex import distance
+from character.Character import Character
+from character.Tasks import CraftingTask, DepositTask, FightTask, GatherTask, Task
+from characters import TMPCharacter
+from planner.AcquisitionCost import AcquisitionCostModel, MOVE_SECONDS_PER_TILE
+from planner.RoutePlanner import RoutePlanner
+
+KINDS = ("gather", "craft", "fight")
+# most standing-order chunks one character takes on as a single round
+ROUND_CHUNKS = 4
+
+
+@dataclass
+class Job:
+    kind: str  # one of KINDS
+    code: str  # item to gather or craft, monster to fight
+    quantity: int
+    chunk: int = 5  # units handed out at a time, the grain idle characters pick work up at
+    priority: int = 0
+    repeat: bool = False  # standing order, starts over once done
+    id: int = field(default_factory=count().__next__)
+    queued: int = field(init=False)
+    done: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"unknown job kind {self.kind!r}, expected one of {KINDS}")
+        self.queued = self.quantity
+
+    @property
+    def finished(self) -> bool:
+        return self.done >= self.quantity
+
+    def __str__(self):
+        return f"{self.kind} {self.quantity} {self.code} (#{self.id}, {self.done} done, {self.queued} queued)"
+
+
+class JobQueue:
+    """Account-wide work shared by every character.
+
+    Jobs are handed out a chunk at a time to whichever character becomes free. A free
+    character estimates every open chunk for itself (cooldown left, travel from where it
+    stands, and the expected seconds per unit from its skills, gear and win odds) and for
+    every other character, counting how long they are still busy. It takes the chunk it
+    holds the biggest edge on, so specialists keep their jobs while idle characters still
+    pick up whatever backlog is left. A job that no character can do at all, such as a
+    monster nobody can beat, is dropped rather than left queued forever. A chunk and the bank trip after it are routed
+    together, so the spawn or workshop picked is the one closest to a bank as well; a character best placed for
+    several standing orders takes a chunk of each and walks them as one cycle.
+    """
+
+    def __init__(self, characters: list[TMPCharacter], deposit_after_chunk: bool = True,
+                 pool: CombatWorkerPool | None = None):
+        self.client: ArtifactsAPI = ArtifactsAPI.instance()
+        self.characters = characters
+        self.deposit_after_chunk = deposit_after_chunk
+        # fight chunks search their loadout here instead of on the event loop
+        self.pool = pool
+        self.route_planner = RoutePlanner(self.client.catalog)
+        self.jobs: list[Job] = []
+        # jobs taken out of the queue because no character could do them
+        self.dropped: list[Job] = []
+        self.busy_until: dict[str, float] = defaultdict(float)
+        self.active = 0
+        # while accepting, idle workers wait for new jobs instead of leaving
+        self.accepting = False
+        self.changed = asyncio.Condition()
+        self.started = self.client.clock.monotonic()
+        self.history: dict[str, dict] = defaultdict(lambda: {"chunks": 0, "units": 0, "busy_seconds": 0.0})
+        # (character, kind, code) -> (character state version, travel seconds, seconds per unit)
+        self._rates: dict[tuple[str, str, str], tuple[int, float, float]] = {}
+
+    def submit(self, *jobs: Job):
+        self.jobs.extend(jobs)
+
+    async def wake(self):
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def close(self):
+        """Stop taking work: standing orders finish their round and idle workers leave."""
+        self.accepting = False
+        for job in self.jobs:
+            job.repeat = False
+        await self.wake()
+
+    def _costs(self, character: TMPCharacter) -> tuple[AcquisitionCostModel, dict] | None:
+        if (data := self.client.characters.get(character.name)) is None:
+            return None
+        return AcquisitionCostModel.for_character(self.client.catalog, Character(character.name, data)), data
+
+    def estimate(self, character: TMPCharacter, job: Job, quantity: int) -> float:
+        """Expected seconds until ``character`` would be done with ``quantity`` units of the job."""
+        key = (character.name, job.kind, job.code)
+        version = self.client.characters.version(character.name)
+        if (rate := self._rates.get(key)) is None or rate[0] != version:
+            if (known := self._costs(character)) is None:
+                return math.inf
+            rate = self._rates[key] = (version, *self._rate(*known, job))
+        _, travel, unit_seconds = rate
+        return self.client.scheduler.ready_in(character.name) + travel + quantity * unit_seconds
+
+    def _rate(self, costs: AcquisitionCostModel, data: dict, job: Job) -> tuple[float, float]:
+        """Travel seconds to the job and seconds per unit there, from the character's current state."""
+        match job.kind:
+            case "gather":
+                source = costs.cheapest(job.code, kinds=("monster", "resource"))
+                content, unit_seconds = (source.code, source.unit_seconds) if source else (None, math.inf)
+            case "craft":
+                source = costs.cheapest(job.code, kinds=("craft",))
+                content, unit_seconds = (source.tile["content"]["code"], source.unit_seconds) if source else (None, math.inf)
+            case _:
+                win_probability, seconds = costs.fight(self.client.catalog.monster(job.code))
+                content, unit_seconds = job.code, seconds / win_probability if win_probability > 1e-9 else math.inf
+        if not content or unit_seconds == math.inf:
+            return math.inf, math.inf
+        position = (data["x"], data["y"])
+        tile = self.client.catalog.index.nearest(position, content=content)
+        travel = distance(position, (tile["x"], tile["y"])) * MOVE_SECONDS_PER_TILE if tile else math.inf
+        return travel, unit_seconds
+
+    def _drop_infeasible(self) -> list[Job]:
+        infeasible = [
+            job for job in self.jobs
+            if job.queued > 0 and all(self.estimate(character, job, 1) == math.inf for character in self.characters)
+        ]
+        for job in infeasible:
+            self.jobs.remove(job)
+            self.dropped.append(job)
+            self.client.events.emit(None, "job_dropped", f"Dropped {job}, no character can do it",
+                                    job=job.id, kind=job.kind, code=job.code)
+        return infeasible
+
+    def _offers(self, character: TMPCharacter) -> list[tuple[tuple, Job, int, float]]:
+        """(key, job, chunk quantity, estimate) of every open chunk the character can do, best first."""
+        now = self.client.clock.monotonic()
+        offers = []
+        for job in self.jobs:
+            if job.queued <= 0:
+                continue
+            quantity = min(job.chunk, job.queued)
+            mine = self.estimate(character, job, quantity)
+            if mine == math.inf:
+                continue
+            soonest = min(
+                max(0.0, self.busy_until[other.name] - now) + self.estimate(other, job, quantity)
+                for other in self.characters if other.name != character.name
+            ) if len(self.characters) > 1 else mine
+            # how much slower this character is than the best placed one, 1.0 or less means it is the one
+            key = (-job.priority, mine / soonest if soonest else 1.0, mine)
+            offers.append((key, job, quantity, mine))
+        return sorted(offers, key=lambda offer: offer[0])
+
+    def _pick(self, character: TMPCharacter) -> list[tuple[Job, int, float]]:
+        """The chunk the character holds the biggest edge on, and with a standing order the rest of its round.
+
+        A round adds a chunk of every other standing order the character is best placed for,
+        so the orders it keeps doing are walked as one loop instead of one bank trip each.
+        """
+        offers = self._offers(character)
+        if not offers:
+            return []
+        _, job, quantity, estimate = offers[0]
+        picked = [(job, quantity, estimate)]
+        if job.repeat:
+            picked += [(other, quantity, estimate) for (_, ratio, _), other, quantity, estimate in offers[1:]
+                       if other.repeat and ratio <= 1.0][:ROUND_CHUNKS - 1]
+        return picked
+
+    def _task(self, character: TMPCharacter, job: Job, quantity: int) -> Task:
+        match job.kind:
+            case "gather":
+                return GatherTask(character, quantity, job.code)
+            case "craft":
+                return CraftingTask(character, quantity, job.code)
+            case _:
+                return FightTask(character, quantity, job.code, pool=self.pool)
+
+    async def work(self, character: TMPCharacter):
+        name = character.name
+        while True:
+            if self._drop_infeasible():
+                await self.wake()
+            if not (picked := self._pick(character)):
+                # with nobody working, nothing this character can do will ever show up
+                if not self.active and not self.accepting:
+                    await self.wake()
+                    return
+                async with self.changed:
+                    await self.changed.wait()
+                continue
+            for job, quantity, _ in picked:
+                job.queued -= quantity
+            self.active += 1
+            self.busy_until[name] = self.client.clock.monotonic() + sum(estimate for *_, estimate in picked)
+            started = self.client.clock.monotonic()
+            try:
+                tasks = []
+                for job, quantity, _ in picked:
+                    tasks.append(self._task(character, job, quantity))
+                    if self.deposit_after_chunk:
+                        tasks.append(DepositTask(character))
+                data = await self.client.get_characters_data(name)
+                # a round of standing orders comes round again, so it is routed back to where it starts
+                route = self.route_planner.plan(tasks, origin=(data["x"], data["y"]), cyclic=len(picked) > 1)
+                for task in route.tasks:
+                    await task()
+            except Exception:
+                # hand the chunks back so someone else can take them
+                for job, quantity, _ in picked:
+                    job.queued += quantity
+                raise
+            finally:
+                self.active -= 1
+                self.busy_until[name] = 0.0
+            history = self.history[name]
+            for job, quantity, _ in picked:
+                job.done += quantity
+                if job.finished and job.repeat:
+                    job.done, job.queued = 0, job.quantity
+                history["chunks"] += 1
+                history["units"] += quantity
+            history["busy_seconds"] += self.client.clock.monotonic() - started
+            await self.wake()
+
+    async def run(self):
+        await self.client.get_all_characters_data()
+        self.started = self.client.clock.monotonic()
+        await asyncio.gather(*(self.work(character) for character in self.characters))
+
+    def stats(self) -> dict:
+        elapsed = max(self.client.clock.monotonic() - self.started, 1e-9)
+        units = sum(history["units"] for history in self.history.values())
+        return {
+            "characters": {name: dict(history) for name, history in self.history.items()},
+            "jobs": [str(job) for job in self.jobs],
+            "dropped": [str(job) for job in self.dropped],
+            "units_per_hour": round(units / elapsed * 3600, 1)
+        }
@@ -0,0 +1,189 @@
+import asyncio
+import math
+from collections import defaultdict
+
+from api.ArtifactsAPI import ArtifactsAPI
+from character.Tasks import CraftingTask, DepositTask
+from characters import TMPCharacter
+from jobs.JobQueue import Job, JobQueue
+from planner.RecipePlanner import CraftingPlan, RecipePlanner
+
+
+class ProductionLine:
+    """Suppliers stage raw materials in the bank while one crafter turns them into the targets.
+
+    Suppliers are job queue workers: the crafter submits gather jobs for every raw
+    material the remaining targets still lack, and they deposit each finished chunk.
+    The crafter crafts a batch as soon as the bank holds everything it needs and
+    otherwise waits for the next deposit, topping up supply jobs if stock fell short.
+    A target that needs a material the queue had to drop is given up on, so every round
+    of the targets ends.
+    """
+
+    # the crafter rechecks the bank at least this often while starved
+    STARVED_POLL = 30
+
+    def __init__(self, crafter: TMPCharacter, suppliers: list[TMPCharacter], targets: dict[str, int],
+                 batch: int = 1, chunk: int = 10, queue: JobQueue | None = None):
+        self.client: ArtifactsAPI = ArtifactsAPI.instance()
+        self.crafter = crafter
+        self.targets = dict(targets)
+        self.remaining = dict(targets)
+        # targets given up on because a material they need cannot be supplied
+        self.dropped: dict[str, int] = {}
+        self.batch = batch
+        self.chunk = chunk
+        self.queue = queue or JobQueue(suppliers)
+        self.planner = RecipePlanner(self.client.catalog)
+        self.supply: list[Job] = []
+        # units supplied by jobs already retired from the queue, see _retire_supply
+        self.supplied: dict[str, int] = defaultdict(int)
+        self.started = self.client.clock.monotonic()
+        # times every target has been crafted
+        self.rounds = 0
+        self.crafter_stats = {"batches": 0, "units": 0, "busy_seconds": 0.0, "starved_seconds": 0.0}
+        # raw units the targets need in total, used to convert supply rates into targets per hour
+        self.demand = self.planner.plan(self.targets).raw_materials
+
+    async def _plan(self, targets: dict[str, int]) -> CraftingPlan:
+        name = self.crafter.name
+        await self.client.get_characters_data(name)
+        await self.client.get_bank_items()
+        inventory = defaultdict(int)
+        for slot in self.client.characters.inventory(name):
+            inventory[slot["code"]] += slot["quantity"]
+        bank = {code: self.client.bank.available(code, owner=name) for code in self.planner.topological_order(targets)}
+        return self.planner.plan(targets, inventory, bank)
+
+    async def _top_up_supply(self):
+        plan = await self._plan({code: quantity for code, quantity in self.remaining.items() if quantity})
+        submitted = False
+        for code, needed in plan.gathers.items():
+            outstanding = sum(job.quantity - job.done for job in self.supply if job.code == code)
+            if needed > outstanding:
+                job = Job("gather", code, needed - outstanding, chunk=self.chunk, priority=1)
+                self.supply.append(job)
+                self.queue.submit(job)
+                submitted = True
+        if submitted:
+            await self.queue.wake()
+
+    def _retire_supply(self):
+        # finished supply jobs leave the queue between rounds, or a line that runs for days keeps growing it
+        for job in [job for job in self.supply if job.finished]:
+            self.supplied[job.code] += job.done
+            self.supply.remove(job)
+            if job in self.queue.jobs:
+                self.queue.jobs.remove(job)
+
+    async def _drop_unsupplied(self):
+        unsupplied = {job.code for job in self.queue.dropped if job in self.supply}
+        if not unsupplied:
+            return
+        for code, remaining in self.remaining.items():
+            if not remaining:
+                continue
+            if missing := unsupplied & (await self._plan({code: remaining})).gathers.keys():
+                self.dropped[code] = remaining
+                self.remaining[code] = 0
+                self.client.events.log(self.crafter.name, f"Dropped {remaining} {code}, "
+                                                          f"no one can supply {', '.join(sorted(missing))}",
+                                       target=code, quantity=remaining)
+
+    async def _craft_ready_batches(self) -> bool:
+        crafted = False
+        for code, remaining in self.remaining.items():
+            if not remaining:
+                continue
+            batch = min(self.batch, remaining)
+            if (await self._plan({code: batch})).gathers:
+                continue
+            started = self.client.clock.monotonic()
+            await CraftingTask(self.crafter, batch, code)()
+            await DepositTask(self.crafter)()
+            self.remaining[code] -= batch
+            self.crafter_stats["batches"] += 1
+            self.crafter_stats["units"] += batch
+            self.crafter_stats["busy_seconds"] += self.client.clock.monotonic() - started
+            crafted = True
+        return crafted
+
+    async def craft(self):
+        while any(self.remaining.values()):
+            if await self._craft_ready_batches():
+                continue
+            await self._drop_unsupplied()
+            if not any(self.remaining.values()):
+                break
+            await self._top_up_supply()
+            started = self.client.clock.monotonic()
+            async with self.queue.changed:
+                try:
+                    await self.client.clock.wait_for(self.queue.changed.wait(), self.STARVED_POLL)
+                except asyncio.TimeoutError:
+                    pass
+            self.crafter_stats["starved_seconds"] += self.client.clock.monotonic() - started
+
+    async def run(self, rounds: float = 1):
+        """Craft the targets ``rounds`` times over, ``math.inf`` to keep going until cancelled.
+
+        The queue works throughout, so standing orders submitted to it keep running between
+        rounds and only wind down after the last one.
+        """
+        self.started = self.client.clock.monotonic()
+        self.queue.accepting = True
+        suppliers = asyncio.create_task(self.queue.run())
+        running = {suppliers}
+        try:
+            while self.rounds < rounds and len(self.dropped) < len(self.targets):
+                if self.rounds:
+                    self._retire_supply()
+                    self.remaining = {code: 0 if code in self.dropped else quantity
+                                      for code, quantity in self.targets.items()}
+                crafting = asyncio.create_task(self.craft())
+                running.add(crafting)
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                if suppliers.done():
+                    suppliers.result()
+                    raise RuntimeError("The suppliers stopped while the line was still crafting")
+                running.discard(crafting)
+                crafting.result()
+                self.rounds += 1
+            if rounds == math.inf:
+                # every target was dropped, the suppliers carry on with the standing orders alone
+                await suppliers
+        except BaseException:
+            # cancelled or failed: stop everyone mid-chunk instead of letting them finish their round
+            for task in running:
+                task.cancel()
+            await asyncio.wait(running)
+            raise
+        await self.queue.close()
+        await suppliers
+
+    def stats(self) -> dict:
+        hours = max(self.client.clock.monotonic() - self.started, 1e-9) / 3600
+        total = sum(self.targets.values())
+        stages = {}
+        for code, needed in self.demand.items():
+            produced = self.supplied[code] + sum(job.done for job in self.supply if job.code == code)
+            stages[code] = {
+                "produced": produced,
+                "per_hour": round(produced / hours, 1),
+                "targets_per_hour": round(produced / hours / (needed / total), 2)
+            }
+        busy_hours = self.crafter_stats["busy_seconds"] / 3600
+        stages["crafter"] = {
+            **self.crafter_stats,
+            "per_hour": round(self.crafter_stats["units"] / hours, 1),
+            "targets_per_hour": round(self.crafter_stats["units"] / busy_hours, 2) if busy_hours else None
+        }
+        measured = {stage: values["targets_per_hour"] for stage, values in stages.items()
+                    if values["targets_per_hour"] is not None}
+        return {
+            "stages": stages,
+            "bottleneck": min(measured, key=measured.get) if measured else None,
+            "rounds": self.rounds,
+            "remaining": {code: quantity for code, quantity in self.remaining.items() if quantity},
+            "dropped": dict(self.dropped)
+        }
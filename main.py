@@ -1,52 +1,62 @@
 import asyncio
 import math
 
+from CombatSimulator.Workers import CombatWorkerPool
 from api.ArtifactsAPI import ArtifactsAPI
-from character.Tasks import Task, CraftingTask, DepositTask, FightTask, GatherTask
 from characters import characters
+from jobs.JobQueue import Job, JobQueue
+from jobs.ProductionLine import ProductionLine
 from utils import clear_logs
 
-a: ArtifactsAPI = ArtifactsAPI.instance()
-
-
-async def execute_tasks(*tasks: *list[Task], cycles=math.inf):
-    i = 0
-    while i < cycles:
-        for task in tasks:
-            await task()
-        i += 1
-
 
 async def main():
-    await asyncio.gather(
-        execute_tasks(
-            FightTask(characters[0], 20, "pig"),
-            DepositTask(characters[0]),
-            FightTask(characters[0], 20, "skeleton"),
-            DepositTask(characters[0])
-        ),
-        execute_tasks(
-            *[CraftingTask(characters[1], 1, item) for item in
-              "tromatising_mask steel_legs_armor steel_armor steel_boots steel_helm".split()],
-            DepositTask(characters[1])),
-        execute_tasks(CraftingTask(characters[2], 5, "cheese"), DepositTask(characters[2])),
-        execute_tasks(FightTask(characters[3], 20, "flying_serpent"), DepositTask(characters[3])),
-        execute_tasks(FightTask(characters[4], 20, "wolf"), DepositTask(characters[4]))
+    crafter = characters[1]
+    pool = CombatWorkerPool.from_client(ArtifactsAPI.instance())
+    queue = JobQueue([character for character in characters if character is not crafter], pool=pool)
+    queue.submit(
+        *[Job("fight", monster, 20, repeat=True) for monster in ("pig", "skeleton", "flying_serpent", "wolf")]
+    )
+    line = ProductionLine(
+        crafter,
+        queue.characters,
+        targets={
+            **{item: 1 for item in "tromatising_mask steel_legs_armor steel_armor steel_boots steel_helm".split()},
+            "cheese": 5
+        },
+        queue=queue
     )
+    try:
+        # craft the targets over and over while the standing orders keep farming
+        await line.run(rounds=math.inf)
+    finally:
+        pool.close()
+        print(f"Production line: {line.stats()}")
+        print(f"Job queue: {queue.stats()}")
 
 
 async def retry_main():
+    # created here rather than on import: spawned combat workers import this module too
+    a: ArtifactsAPI = ArtifactsAPI.instance()
     clear_logs()
-    while True:
-        if a.server_is_up():
-            try:
-                await main()
-            except Exception as e:
-                print(f"Error occurred: {e}. Retrying in 10 seconds...")
-                await asyncio.sleep(10)
-        else:
-            print("Server is down. Waiting for it to come back up...")
-            await asyncio.sleep(10)
+    metrics_endpoint = await a.metrics.serve()
+    try:
+        while True:
+            if await a.server_is_up():
+                try:
+                    await main()
+                except Exception as e:
+                    print(f"Error occurred: {e}. Retrying in 10 seconds...")
+                    await a.clock.sleep(10)
+            else:
+                print("Server is down. Waiting for it to come back up...")
+                await a.clock.sleep(10)
+    finally:
+        print(f"Time spent queued by the rate limiter: {a.rate_limiter.stats()}")
+        for character in characters:
+            print(f"[{character.name}] {a.metrics.character_summary(character.name)}")
+        print(f"Per task: {a.metrics.task_summary()}")
+        await metrics_endpoint.cleanup()
+        await a.close()
 
 
 if __name__ == "__main__":
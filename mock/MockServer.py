@@ -0,0 +1,430 @@
+"""Local stand-in for the Artifacts API, for offline load tests and error reproduction.
+
+Run from the repository root and point the client at it:
+
+    python -m mock.MockServer --characters 50 --cooldown-scale 0.01 --fail 499:0.01
+    API_ROOT_URL=http://localhost:8765 python main.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import pickle
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+from aiohttp import web
+
+from CombatSimulator import MonteCarlo
+from CombatSimulator.Fighters import ELEMENTS, FighterStats
+from api.Clock import Clock
+from characters import TMPCharacter, characters as configured_characters
+from utils import skill_names
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "catalog.json")
+SLOTS = ["weapon", "shield", "helmet", "body_armor", "leg_armor", "boots", "ring1", "ring2", "amulet",
+         "artifact1", "artifact2", "artifact3", "consumable1", "consumable2"]
+STATS = ("hp", *(f"{stat}_{element}" for stat in ("attack", "dmg", "res") for element in ELEMENTS))
+
+# cooldown rules, in game seconds before scaling
+MOVE_SECONDS_PER_TILE = 5
+FIGHT_SECONDS_PER_TURN = 2
+GATHER_SECONDS = 25
+CRAFT_SECONDS = 10
+BANK_SECONDS = 3
+EQUIP_SECONDS = 1
+
+# what every character starts wearing, enough to beat each monster in the fixture
+DEFAULT_GEAR = {
+    "weapon": "multislimes_sword", "shield": "wooden_shield", "helmet": "iron_helm", "body_armor": "leather_armor",
+    "leg_armor": "copper_legs_armor", "boots": "copper_boots", "ring1": "copper_ring", "ring2": "iron_ring",
+    "amulet": "life_amulet"
+}
+
+
+class MockError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+@dataclass
+class MockConfig:
+    characters: int = 5
+    cooldown_scale: float = 1.0
+    latency: float = 0.0
+    jitter: float = 0.0
+    # injected error code -> probability per action request
+    failures: dict[int, float] = field(default_factory=dict)
+    seed: int | None = None
+    # starting character and skill level, base hp and equipped items (slot -> item code)
+    level: int = 20
+    hp: int = 300
+    gear: dict[str, str] = field(default_factory=lambda: dict(DEFAULT_GEAR))
+
+
+def load_catalog(path: str = FIXTURE) -> dict:
+    """A JSON fixture, or a snapshot written by CatalogCache."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    with open(path, "rb") as file:
+        snapshot = pickle.load(file)
+    return {"version": snapshot.get("server_version") or "mock",
+            **{key: snapshot[key] for key in ("tiles", "monsters", "resources", "items")}}
+
+
+class MockServer:
+    """Game state for one account: characters, bank, cooldowns, and the rules that change them."""
+
+    def __init__(self, catalog: dict, config: MockConfig | None = None, clock: Clock | None = None):
+        self.config = config or MockConfig()
+        # cooldowns follow this clock, share the client's VirtualClock to simulate time
+        self.clock = clock or Clock()
+        self.catalog = catalog
+        self.items = {item["code"]: item for item in catalog["items"]}
+        self.monsters = {monster["code"]: monster for monster in catalog["monsters"]}
+        self.resources = {resource["code"]: resource for resource in catalog["resources"]}
+        self.tiles = {(tile["x"], tile["y"]): tile for tile in catalog["tiles"]}
+        self.random = random.Random(self.config.seed)
+        self.rng = np.random.default_rng(self.config.seed)
+        self.bank: dict[str, int] = {}
+        self.requests: Counter = Counter()
+        self.results: Counter = Counter()
+        configured = {character.name: character for character in configured_characters}
+        names = list(configured)
+        names += [f"sim_{i}" for i in range(max(0, self.config.characters - len(names)))]
+        self.characters = {name: self._new_character(name, configured.get(name))
+                           for name in names[:self.config.characters]}
+
+    def _new_character(self, name: str, configured: TMPCharacter | None = None) -> dict:
+        level = self.config.level
+        character = {
+            "name": name, "skin": "men1", "level": level, "xp": 0, "max_xp": 1000, "total_xp": 0, "gold": 0,
+            "speed": 0, "hp": self.config.hp, "haste": 0, "critical_strike": 0, "stamina": 0, "x": 0, "y": 0,
+            "cooldown": 0, "cooldown_expiration": None, "task": "", "task_type": "", "task_progress": 0,
+            "task_total": 0, "inventory_max_items": 100,
+            "inventory": [{"slot": i + 1, "code": "", "quantity": 0} for i in range(20)],
+            "_ready": 0.0
+        }
+        for skill in skill_names:
+            character[f"{skill}_level"], character[f"{skill}_xp"], character[f"{skill}_max_xp"] = level, 0, 1000
+        for stat in STATS[1:]:
+            character[stat] = 0
+        character["attack_earth"] = 6
+        for slot in SLOTS:
+            character[f"{slot}_slot"] = ""
+        character["consumable1_slot_quantity"] = character["consumable2_slot_quantity"] = 0
+        # items missing from the catalog in use, such as a trimmed snapshot, are skipped
+        for slot, code in self.config.gear.items():
+            if code in self.items:
+                self._apply_effects(character, code, 1)
+                character[f"{slot}_slot"] = code
+        # configured characters carry their tools and the gear they never deposit
+        if configured:
+            for code in {*configured.tools.values(), *(configured.persistent_inventory or [])}:
+                if code in self.items:
+                    self._add(character, code, 1)
+        return character
+
+    @staticmethod
+    def fighter_stats(character: dict) -> FighterStats:
+        return FighterStats(
+            hp=character["hp"],
+            attack=tuple(character[f"attack_{element}"] for element in ELEMENTS),
+            damage=tuple(character[f"dmg_{element}"] for element in ELEMENTS),
+            resistance=tuple(character[f"res_{element}"] for element in ELEMENTS)
+        )
+
+    # state helpers
+
+    @staticmethod
+    def public(character: dict) -> dict:
+        return {key: value for key, value in character.items() if not key.startswith("_")}
+
+    @staticmethod
+    def quantity(character: dict, code: str) -> int:
+        return sum(slot["quantity"] for slot in character["inventory"] if slot["code"] == code)
+
+    @staticmethod
+    def _carried(character: dict) -> int:
+        return sum(slot["quantity"] for slot in character["inventory"])
+
+    def _add(self, character: dict, code: str, quantity: int):
+        for slot in character["inventory"]:
+            if slot["code"] == code:
+                slot["quantity"] += quantity
+                if slot["quantity"] <= 0:
+                    slot["code"], slot["quantity"] = "", 0
+                return
+        for slot in character["inventory"]:
+            if not slot["code"]:
+                slot["code"], slot["quantity"] = code, quantity
+                return
+        raise MockError(497, "Character inventory is full.")
+
+    def _can_carry(self, character: dict, codes: list[str], quantity: int):
+        free_slots = sum(1 for slot in character["inventory"] if not slot["code"])
+        new_codes = {code for code in codes if not self.quantity(character, code)}
+        if self._carried(character) + quantity > character["inventory_max_items"] or len(new_codes) > free_slots:
+            raise MockError(497, "Character inventory is full.")
+
+    def _apply_effects(self, character: dict, code: str, sign: int):
+        for effect in self.items[code]["effects"]:
+            if effect["name"] in STATS:
+                character[effect["name"]] += sign * effect["value"]
+
+    def _cooldown(self, character: dict, seconds: float, reason: str) -> dict:
+        scaled = seconds * self.config.cooldown_scale
+        character["_ready"] = self.clock.time() + scaled
+        character["cooldown"] = round(scaled)
+        character["cooldown_expiration"] = datetime.fromtimestamp(character["_ready"], timezone.utc).isoformat()
+        return {"total_seconds": scaled, "remaining_seconds": scaled,
+                "expiration": character["cooldown_expiration"], "reason": reason}
+
+    def _content(self, character: dict, content_type: str) -> dict:
+        content = self.tiles[(character["x"], character["y"])]["content"]
+        if not content or content["type"] != content_type:
+            raise MockError(598, f"No {content_type} on this map.")
+        return content
+
+    def _drops(self, drops: list[dict]) -> list[dict]:
+        dropped = Counter()
+        for drop in drops:
+            if self.random.random() < 1 / drop["rate"]:
+                dropped[drop["code"]] += self.random.randint(drop["min_quantity"], drop["max_quantity"])
+        return [{"code": code, "quantity": quantity} for code, quantity in dropped.items()]
+
+    def _gain_skill_xp(self, character: dict, skill: str, xp: int):
+        character[f"{skill}_xp"] += xp
+
+    # actions
+
+    def move(self, character: dict, body: dict) -> dict:
+        destination = (body["x"], body["y"])
+        if destination not in self.tiles:
+            raise MockError(404, "Map not found.")
+        if (character["x"], character["y"]) == destination:
+            raise MockError(490, "Character already at destination.")
+        tiles = abs(character["x"] - destination[0]) + abs(character["y"] - destination[1])
+        character["x"], character["y"] = destination
+        return {"cooldown": self._cooldown(character, MOVE_SECONDS_PER_TILE * tiles, "movement"),
+                "destination": self.tiles[destination]}
+
+    def fight(self, character: dict, body: dict) -> dict:
+        monster = self.monsters[self._content(character, "monster")["code"]]
+        drops = self._drops(monster["drops"])
+        self._can_carry(character, [drop["code"] for drop in drops], sum(drop["quantity"] for drop in drops))
+        outcome = MonteCarlo.simulate(self.fighter_stats(character), FighterStats.from_monster(monster), trials=1,
+                                      rng=self.rng)
+        won = outcome["all_wins"]
+        turns = int(outcome["avg_turns"])
+        result = {"xp": 0, "gold": 0, "drops": [], "turns": turns, "result": "win" if won else "lose", "logs": []}
+        if won:
+            result["xp"] = monster["level"] * 10
+            result["gold"] = self.random.randint(monster["min_gold"], monster["max_gold"])
+            result["drops"] = drops
+            character["xp"] += result["xp"]
+            character["gold"] += result["gold"]
+            for drop in drops:
+                self._add(character, drop["code"], drop["quantity"])
+        else:
+            # the fallen character respawns at the origin
+            character["x"], character["y"] = 0, 0
+        return {"cooldown": self._cooldown(character, FIGHT_SECONDS_PER_TURN * turns, "fight"), "fight": result}
+
+    def gathering(self, character: dict, body: dict) -> dict:
+        resource = self.resources[self._content(character, "resource")["code"]]
+        if character[f"{resource['skill']}_level"] < resource["level"]:
+            raise MockError(493, "Not skill level required.")
+        drops = self._drops(resource["drops"])
+        self._can_carry(character, [drop["code"] for drop in drops], sum(drop["quantity"] for drop in drops))
+        for drop in drops:
+            self._add(character, drop["code"], drop["quantity"])
+        self._gain_skill_xp(character, resource["skill"], resource["level"] * 5)
+        return {"cooldown": self._cooldown(character, GATHER_SECONDS, "gathering"),
+                "details": {"xp": resource["level"] * 5, "items": drops}}
+
+    def crafting(self, character: dict, body: dict) -> dict:
+        item = self.items.get(body["code"])
+        if not item or not item["craft"]:
+            raise MockError(404, "Craft not found.")
+        craft, crafts = item["craft"], body.get("quantity", 1)
+        if self._content(character, "workshop")["code"] != craft["skill"]:
+            raise MockError(598, "Workshop not found on this map.")
+        if character[f"{craft['skill']}_level"] < craft["level"]:
+            raise MockError(493, "Not skill level required.")
+        for part in craft["items"]:
+            if self.quantity(character, part["code"]) < part["quantity"] * crafts:
+                raise MockError(478, "Missing item or insufficient quantity.")
+        for part in craft["items"]:
+            self._add(character, part["code"], -part["quantity"] * crafts)
+        made = (craft.get("quantity") or 1) * crafts
+        self._add(character, item["code"], made)
+        self._gain_skill_xp(character, craft["skill"], craft["level"] * 5 * crafts)
+        return {"cooldown": self._cooldown(character, CRAFT_SECONDS * crafts, "crafting"),
+                "details": {"xp": craft["level"] * 5 * crafts, "items": [{"code": item["code"], "quantity": made}]}}
+
+    def _bank(self) -> list[dict]:
+        return [{"code": code, "quantity": quantity} for code, quantity in self.bank.items()]
+
+    def deposit(self, character: dict, body: dict) -> dict:
+        self._content(character, "bank")
+        if self.quantity(character, body["code"]) < body["quantity"]:
+            raise MockError(478, "Missing item or insufficient quantity.")
+        self._add(character, body["code"], -body["quantity"])
+        self.bank[body["code"]] = self.bank.get(body["code"], 0) + body["quantity"]
+        return {"cooldown": self._cooldown(character, BANK_SECONDS, "deposit"), "item": self.items[body["code"]],
+                "bank": self._bank()}
+
+    def withdraw(self, character: dict, body: dict) -> dict:
+        self._content(character, "bank")
+        if self.bank.get(body["code"], 0) < body["quantity"]:
+            raise MockError(404, "Item not found.")
+        self._can_carry(character, [body["code"]], body["quantity"])
+        self.bank[body["code"]] -= body["quantity"]
+        if not self.bank[body["code"]]:
+            del self.bank[body["code"]]
+        self._add(character, body["code"], body["quantity"])
+        return {"cooldown": self._cooldown(character, BANK_SECONDS, "withdraw"), "item": self.items[body["code"]],
+                "bank": self._bank()}
+
+    def equip(self, character: dict, body: dict) -> dict:
+        slot = f"{body['slot']}_slot"
+        if slot not in character:
+            raise MockError(422, "Invalid slot.")
+        if character[slot]:
+            raise MockError(485, "Slot not empty.")
+        if not self.quantity(character, body["code"]):
+            raise MockError(478, "Missing item or insufficient quantity.")
+        self._add(character, body["code"], -1)
+        character[slot] = body["code"]
+        self._apply_effects(character, body["code"], 1)
+        return {"cooldown": self._cooldown(character, EQUIP_SECONDS, "equip"), "slot": body["slot"],
+                "item": self.items[body["code"]]}
+
+    def unequip(self, character: dict, body: dict) -> dict:
+        slot = f"{body['slot']}_slot"
+        if not character.get(slot):
+            raise MockError(491, "Slot is empty.")
+        code = character[slot]
+        self._can_carry(character, [code], 1)
+        self._apply_effects(character, code, -1)
+        self._add(character, code, 1)
+        character[slot] = ""
+        return {"cooldown": self._cooldown(character, EQUIP_SECONDS, "unequip"), "slot": body["slot"],
+                "item": self.items[code]}
+
+    def new_task(self, character: dict, body: dict) -> dict:
+        if character["task"]:
+            raise MockError(486, "Character already has a task.")
+        monster = self.random.choice(list(self.monsters.values()))
+        character.update(task=monster["code"], task_type="monsters", task_progress=0,
+                         task_total=self.random.randint(10, 30))
+        return {"cooldown": self._cooldown(character, 1, "task"),
+                "task": {"code": monster["code"], "type": "monsters", "total": character["task_total"]}}
+
+    # http
+
+    @staticmethod
+    def _error(code: int, message: str) -> web.Response:
+        return web.json_response({"error": {"code": code, "message": message}}, status=code)
+
+    @staticmethod
+    def _paged(rows: list, request: web.Request) -> web.Response:
+        size, page = int(request.query.get("size", 50)), int(request.query.get("page", 1))
+        return web.json_response({
+            "data": rows[(page - 1) * size:page * size], "total": len(rows), "page": page, "size": size,
+            "pages": max(1, math.ceil(len(rows) / size))
+        })
+
+    def _action(self, handler):
+        async def route(request: web.Request) -> web.Response:
+            character = self.characters.get(request.match_info["name"])
+            if character is None:
+                return self._error(404, "Character not found.")
+            for code, probability in self.config.failures.items():
+                if self.random.random() < probability:
+                    self.results[code] += 1
+                    return self._error(code, "Injected by the mock server.")
+            if (left := character["_ready"] - self.clock.time()) > 0:
+                self.results[499] += 1
+                return self._error(499, f"Character in cooldown: {left:.2f} seconds left.")
+            body = await request.json() if request.can_read_body else {}
+            try:
+                data = handler(character, body)
+            except MockError as error:
+                self.results[error.code] += 1
+                return self._error(error.code, error.message)
+            self.results[200] += 1
+            return web.json_response({"data": {**data, "character": self.public(character)}})
+
+        return route
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests[request.path if request.method == "GET" else request.path.rsplit("/action/", 1)[-1]] += 1
+        if self.config.latency or self.config.jitter:
+            await asyncio.sleep(max(0.0, self.config.latency + self.random.uniform(-1, 1) * self.config.jitter))
+        return await handler(request)
+
+    def stats(self) -> dict:
+        return {"requests": sum(self.requests.values()), "by_endpoint": dict(self.requests),
+                "results": {str(code): count for code, count in self.results.items()}}
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        route = app.router
+        route.add_get("/", lambda request: web.json_response({"data": {
+            "status": "online", "version": self.catalog["version"], "characters_online": len(self.characters)
+        }}))
+        for path, key in (("/maps", "tiles"), ("/monsters", "monsters"), ("/resources", "resources"),
+                          ("/items", "items")):
+            route.add_get(path, lambda request, key=key: self._paged(self.catalog[key], request))
+        route.add_get("/items/{code}", lambda request: web.json_response({"data": self.items[request.match_info["code"]]})
+                      if request.match_info["code"] in self.items else self._error(404, "Item not found."))
+        route.add_get("/maps/{x}/{y}", lambda request: web.json_response({"data": self.tiles.get(
+            (int(request.match_info["x"]), int(request.match_info["y"])))}))
+        route.add_get("/my/characters", lambda request: web.json_response(
+            {"data": [self.public(character) for character in self.characters.values()]}))
+        route.add_get("/my/bank/items", lambda request: self._paged(self._bank(), request))
+        route.add_get("/mock/stats", lambda request: web.json_response(self.stats()))
+        for path, handler in (("move", self.move), ("fight", self.fight), ("gathering", self.gathering),
+                              ("crafting", self.crafting), ("bank/deposit", self.deposit),
+                              ("bank/withdraw", self.withdraw), ("equip", self.equip), ("unequip", self.unequip),
+                              ("task/new", self.new_task)):
+            route.add_post(f"/my/{{name}}/action/{path}", self._action(handler))
+        return app
+
+
+def _failure(value: str) -> tuple[int, float]:
+    code, probability = value.split(":")
+    return int(code), float(probability)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Artifacts API")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--catalog", default=FIXTURE, help="JSON fixture or .cache/catalog.pickle")
+    parser.add_argument("--characters", type=int, default=5)
+    parser.add_argument("--cooldown-scale", type=float, default=1.0, help="multiplier applied to every cooldown")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="uniform +/- seconds around the latency")
+    parser.add_argument("--fail", type=_failure, action="append", default=[], metavar="CODE:PROBABILITY",
+                        help="inject an error on action requests, e.g. 499:0.01; repeatable")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--level", type=int, default=20, help="starting character and skill level")
+    args = parser.parse_args()
+    config = MockConfig(characters=args.characters, cooldown_scale=args.cooldown_scale, latency=args.latency,
+                        jitter=args.jitter, failures=dict(args.fail), seed=args.seed, level=args.level)
+    web.run_app(MockServer(load_catalog(args.catalog), config).app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
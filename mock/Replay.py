@@ -0,0 +1,113 @@
+"""Serve a recorded run back without the network to benchmark the task stack deterministically.
+
+Record a scenario once, against the mock server or the live API:
+
+    API_RECORD=runs/main.jsonl.gz python -m mock.Simulation --hours 2 --seed 1
+
+then replay it as often as needed; cooldowns pass in virtual time:
+
+    python -m mock.Replay runs/main.jsonl.gz --repeat 5
+
+Every repetition runs in a fresh interpreter. A replay that asks for a request the recording
+does not have, or leaves recorded requests unused, means the task logic changed.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from api.Clock import VirtualClock
+from api.Transport import ReplayMiss, ReplayTransport
+
+
+def replay(path: str, scenario: str = "main:main", hours: float | None = None, latency_scale: float = 0.0,
+           cooldown_scale: float = 1.0) -> dict:
+    from api.ArtifactsAPI import ArtifactsAPI
+
+    clock = VirtualClock()
+    transport = ReplayTransport({}, path, latency_scale=latency_scale, cooldown_scale=cooldown_scale)
+    cpu = time.process_time()
+    # the recorded catalog must not replace the cached snapshot of the live game
+    with tempfile.TemporaryDirectory() as cache:
+        ArtifactsAPI.initialize(clock=clock, transport=transport,
+                                catalog_cache_path=os.path.join(cache, "catalog.pickle"))
+    client = ArtifactsAPI.instance()
+    catalog_cpu = time.process_time() - cpu
+    module, _, function = scenario.partition(":")
+    run = getattr(importlib.import_module(module), function)
+
+    async def play():
+        # stop where the recording stopped unless told otherwise
+        timeout = hours * 60 * 60 if hours else transport.duration - clock.monotonic()
+        try:
+            await clock.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await client.close()
+
+    cpu, wall, miss = time.process_time(), time.monotonic(), None
+    try:
+        asyncio.run(play())
+    except ReplayMiss as error:
+        miss = str(error)
+    return {
+        "catalog_cpu_seconds": round(catalog_cpu, 3),
+        "cpu_seconds": round(time.process_time() - cpu, 3),
+        "wall_seconds": round(time.monotonic() - wall, 3),
+        "simulated_hours": round(clock.monotonic() / 3600, 2),
+        "actions": int(client.metrics.total("actions_total")),
+        **transport.stats(),
+        "miss": miss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded run without the network")
+    parser.add_argument("recording")
+    parser.add_argument("--scenario", default="main:main", help="module:coroutine_function that was recorded")
+    parser.add_argument("--hours", type=float, help="stop after this much simulated time instead of where "
+                                                    "the recording stopped")
+    parser.add_argument("--latency-scale", type=float, default=0.0, help="replay recorded latency times this")
+    parser.add_argument("--cooldown-scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print one JSON report and nothing else")
+    args = parser.parse_args()
+
+    if args.repeat == 1:
+        report = replay(args.recording, args.scenario, args.hours, args.latency_scale, args.cooldown_scale)
+        if args.json:
+            print(json.dumps(report))
+        else:
+            for key, value in report.items():
+                print(f"{key}: {value}")
+        sys.exit(1 if report["miss"] else 0)
+
+    command = [sys.executable, "-m", "mock.Replay", args.recording, "--scenario", args.scenario, "--json",
+               "--latency-scale", str(args.latency_scale), "--cooldown-scale", str(args.cooldown_scale)]
+    if args.hours:
+        command += ["--hours", str(args.hours)]
+    reports = []
+    for _ in range(args.repeat):
+        output = subprocess.run(command, capture_output=True, text=True).stdout
+        # the scenario may print on its own, the report is the last line
+        reports.append(json.loads(output.strip().splitlines()[-1]))
+    for key in ("cpu_seconds", "wall_seconds", "catalog_cpu_seconds"):
+        values = [report[key] for report in reports]
+        print(f"{key}: median {statistics.median(values)}, min {min(values)}, max {max(values)}")
+    for key in ("requests", "actions", "reused", "unused"):
+        print(f"{key}: {sorted({report[key] for report in reports})}")
+    misses = {report["miss"] for report in reports if report["miss"]}
+    if misses:
+        print(f"misses: {misses}")
+    sys.exit(1 if misses else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Replay hours of play in seconds: the client and an in-process MockServer share one VirtualClock.
+
+    python -m mock.Simulation --hours 24
+    python -m mock.Simulation --hours 4 --scenario my_module:my_coroutine
+    python -m mock.Simulation --hours 4 --port 8766    # when 8765 is taken
+
+The scenario is any coroutine function taking no arguments, ``main:main`` by default; it is
+cancelled once the simulated time runs out and the run is summarised per character and task.
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import tempfile
+import threading
+import time
+
+from aiohttp import web
+
+from api.Clock import VirtualClock
+from mock.MockServer import FIXTURE, MockConfig, MockServer, load_catalog
+
+
+def serve_in_thread(server: MockServer, host: str = "localhost", port: int = 8765) -> threading.Thread:
+    """Run the server on its own event loop, so the client can load catalogs before its loop starts."""
+    ready = threading.Event()
+    failure: list[BaseException] = []
+
+    def run():
+        loop = asyncio.new_event_loop()
+        try:
+            runner = web.AppRunner(server.app())
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        except BaseException as error:
+            # a taken port, for one, is raised in the caller rather than leaving it waiting
+            failure.append(error)
+            loop.close()
+            return
+        finally:
+            ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="mock-server", daemon=True)
+    thread.start()
+    ready.wait()
+    if failure:
+        raise failure[0]
+    return thread
+
+
+def simulate(scenario: str = "main:main", hours: float = 24, config: MockConfig | None = None,
+             catalog: str = FIXTURE, port: int = 8765) -> dict:
+    clock = VirtualClock()
+    server = MockServer(load_catalog(catalog), config, clock)
+    serve_in_thread(server, port=port)
+    os.environ["API_ROOT_URL"] = f"http://localhost:{port}"
+
+    from api.ArtifactsAPI import ArtifactsAPI
+    # the fixture catalog must not replace the real game's cached snapshot
+    with tempfile.TemporaryDirectory() as cache:
+        ArtifactsAPI.initialize(clock=clock, catalog_cache_path=os.path.join(cache, "catalog.pickle"))
+    client = ArtifactsAPI.instance()
+    module, _, function = scenario.partition(":")
+    run = getattr(importlib.import_module(module), function)
+
+    async def play():
+        started = clock.monotonic()
+        try:
+            await clock.wait_for(run(), hours * 60 * 60)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await client.close()
+        return clock.monotonic() - started
+
+    wall = time.monotonic()
+    simulated = asyncio.run(play())
+    simulated_hours = max(simulated, 1e-9) / 3600
+    metrics = client.metrics
+    return {
+        "simulated_hours": round(simulated_hours, 2),
+        "wall_seconds": round(time.monotonic() - wall, 1),
+        "requests": server.stats()["requests"],
+        "per_hour": {
+            name.removesuffix("_total"): round(metrics.total(name) / simulated_hours, 1)
+            for name in ("xp_total", "items_total", "gold_total", "kills_total", "actions_total")
+        },
+        "characters": {name: metrics.character_summary(name) for name in server.characters},
+        "tasks": metrics.task_summary()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a scenario against the mock server in simulated time")
+    parser.add_argument("--scenario", default="main:main", help="module:coroutine_function to run")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--characters", type=int, default=5)
+    parser.add_argument("--catalog", default=FIXTURE)
+    parser.add_argument("--port", type=int, default=8765, help="local port for the in-process mock server")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    config = MockConfig(characters=args.characters, seed=args.seed)
+    report = simulate(args.scenario, args.hours, config, args.catalog, args.port)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import json
+import os
+import queue
+import threading
+import time
+
+from api.Clock import Clock
+
+
+class EventLog:
+    """Structured log written from a background thread.
+
+    Callers only put records on a queue, so logging never blocks the event loop. The
+    writer thread drains the queue in batches and appends every record as a JSON line
+    to ``events.jsonl``; records carrying a message also go to ``<character>.log``,
+    the human-readable view. Files are flushed once per batch and rotated once they
+    grow past ``max_bytes`` or have been written to for longer than ``max_age`` seconds.
+    """
+
+    EVENTS_FILE = "events.jsonl"
+    _STOP = object()
+
+    def __init__(self, directory: str = "logs", max_bytes: int = 10 * 1024 * 1024, max_age: float = 24 * 60 * 60,
+                 backups: int = 5, flush_interval: float = 0.5, batch_size: int = 512, clock: Clock | None = None):
+        self.clock = clock or Clock()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_writer(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+                    self._thread.start()
+
+    def emit(self, character: str | None, event: str, message: str | None = None, **fields):
+        record = {"ts": round(self.clock.time(), 3), "character": character, "event": event, **fields}
+        if message is not None:
+            record["message"] = message
+        self._ensure_writer()
+        self._queue.put(record)
+
+    def log(self, character: str, message: str, **fields):
+        self.emit(character, "log", message, **fields)
+
+    def action(self, character: str, action: str, latency: float, cooldown: float, code: int, message: str,
+               **fields):
+        self.emit(character, "action", message, action=action, latency=round(latency, 4),
+                  cooldown=round(cooldown, 3), code=code, **fields)
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Block until everything queued so far is on disk."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 5.0):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _rotate(self, path: str):
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{index}"):
+                os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+        if self.backups:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+
+    def _open(self, files: dict, path: str):
+        handle, opened = files.get(path, (None, 0.0))
+        if handle is not None and (handle.tell() >= self.max_bytes or time.time() - opened >= self.max_age):
+            handle.close()
+            self._rotate(path)
+            handle = None
+        if handle is None:
+            os.makedirs(self.directory, exist_ok=True)
+            handle = open(path, "a", encoding="utf-8")
+            files[path] = (handle, time.time())
+        return handle
+
+    def _write(self, files: dict, records: list[dict]):
+        lines: dict[str, list[str]] = {}
+        for record in records:
+            lines.setdefault(self._path(self.EVENTS_FILE), []).append(json.dumps(record, default=str) + "\n")
+            if record.get("character") and "message" in record:
+                stamp = time.strftime("%H:%M:%S", time.localtime(record["ts"]))
+                lines.setdefault(self._path(f"{record['character']}.log"), []).append(
+                    f"{stamp} {record['message']}\n"
+                )
+        for path, chunk in lines.items():
+            try:
+                handle = self._open(files, path)
+                handle.writelines(chunk)
+                handle.flush()
+            except OSError:
+                self.dropped += len(chunk)
+                files.pop(path, None)
+
+    def _run(self):
+        files: dict[str, tuple] = {}
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # gather records for up to flush_interval, a flush or stop request cuts the wait short
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size and isinstance(batch[-1], dict):
+                    try:
+                        batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+                records = [item for item in batch if isinstance(item, dict)]
+                if records:
+                    self._write(files, records)
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if any(item is self._STOP for item in batch):
+                    return
+        finally:
+            for handle, _ in files.values():
+                handle.close()
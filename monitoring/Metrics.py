@@ -0,0 +1,212 @@
+import math
+import os
+import tempfile
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from aiohttp import web
+
+from api.Clock import Clock
+
+# the Task currently running in this coroutine, so action results can be credited to it
+current_task: ContextVar = ContextVar("current_task", default=None)
+
+Labels = tuple[tuple[str, str], ...]
+
+HELP = {
+    "http_request_seconds": ("summary", "HTTP round trip of API requests"),
+    "rate_limit_wait_seconds": ("summary", "Time requests spent queued by the rate limiter"),
+    "cooldown_wait_seconds": ("summary", "Time actions spent waiting for the character cooldown"),
+    "action_cooldown_seconds": ("summary", "Cooldown granted by successful actions"),
+    "actions_total": ("counter", "Actions sent, by result code"),
+    "action_retries_total": ("counter", "Actions sent again after a cooldown error"),
+    "task_seconds": ("summary", "Wall time of finished tasks"),
+    "xp_total": ("counter", "Experience gained"),
+    "gold_total": ("counter", "Gold gained"),
+    "items_total": ("counter", "Items gained"),
+    "kills_total": ("counter", "Fights won"),
+}
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+def _format_labels(labels: Labels, **extra) -> str:
+    pairs = [*labels, *((key, str(value)) for key, value in extra.items())]
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """In-process counters and summaries, exported in the Prometheus text format.
+
+    Totals are kept since start; every sample is also kept for ``window`` seconds so
+    rates and quantiles describe the recent past rather than the whole run.
+    """
+
+    def __init__(self, window: float = 60 * 60, clock: Clock | None = None):
+        self.window = window
+        self.clock = clock or Clock()
+        self.started = self.clock.monotonic()
+        self.totals: dict[tuple[str, Labels], float] = defaultdict(float)
+        self.counts: dict[tuple[str, Labels], int] = defaultdict(int)
+        self.recent: dict[tuple[str, Labels], deque] = defaultdict(deque)
+
+    def _trim(self, samples: deque, now: float):
+        while samples and samples[0][0] < now - self.window:
+            samples.popleft()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self.observe(name, value, **labels)
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        now = self.clock.monotonic()
+        self.totals[key] += value
+        self.counts[key] += 1
+        samples = self.recent[key]
+        samples.append((now, value))
+        self._trim(samples, now)
+
+    def _matching(self, name: str, labels: dict):
+        wanted = set(_labels(labels))
+        return [key for key in self.totals if key[0] == name and wanted <= set(key[1])]
+
+    def total(self, name: str, **labels) -> float:
+        return sum(self.totals[key] for key in self._matching(name, labels))
+
+    def per_hour(self, name: str, **labels) -> float:
+        """Rolling rate over the window, or since start when the run is younger than it."""
+        now = self.clock.monotonic()
+        span = min(self.window, now - self.started) or 1e-9
+        value = 0.0
+        for key in self._matching(name, labels):
+            self._trim(self.recent[key], now)
+            value += sum(sample for _, sample in self.recent[key])
+        return value / span * 3600
+
+    def quantiles(self, name: str, **labels) -> dict[float, float]:
+        values = sorted(value for key in self._matching(name, labels) for _, value in self.recent[key])
+        if not values:
+            return {}
+        return {q: values[min(len(values) - 1, math.ceil(q * len(values)) - 1)] for q in QUANTILES}
+
+    # hooks
+
+    def record_request(self, kind: str, endpoint: str, character: str | None, queued: float, latency: float):
+        self.observe("rate_limit_wait_seconds", queued, kind=kind, character=character)
+        self.observe("http_request_seconds", latency, kind=kind, endpoint=endpoint, character=character)
+
+    def record_action(self, character: str, action: str, code: int, waited: float, cooldown: float,
+                      retry: bool = False):
+        task = current_task.get()
+        task_name = type(task).__name__ if task else None
+        self.inc("actions_total", character=character, action=action, code=code, task=task_name)
+        self.observe("cooldown_wait_seconds", waited, character=character)
+        if retry:
+            self.inc("action_retries_total", character=character, action=action)
+        if code == 200:
+            self.observe("action_cooldown_seconds", cooldown, character=character, action=action)
+
+    def record_gains(self, character: str, data: dict):
+        if fight := data.get("fight"):
+            xp, gold, items = fight.get("xp", 0), fight.get("gold", 0), fight.get("drops") or []
+        elif details := data.get("details"):
+            xp, gold, items = details.get("xp", 0), 0, details.get("items") or []
+        else:
+            return
+        task = current_task.get()
+        labels = {
+            "character": character,
+            "task": type(task).__name__ if task else None,
+            "target": task and (task.item or (getattr(task, "monster", None) or {}).get("code")),
+        }
+        if fight and fight.get("result") == "win":
+            self.inc("kills_total", **labels)
+        if xp:
+            self.inc("xp_total", xp, **labels)
+        if gold:
+            self.inc("gold_total", gold, **labels)
+        for item in items:
+            self.inc("items_total", item["quantity"], **labels, item=item["code"])
+
+    def record_task(self, task, seconds: float):
+        self.observe("task_seconds", seconds, character=task.character.name, task=type(task).__name__)
+
+    # summaries and export
+
+    def character_summary(self, character: str) -> dict:
+        """Where the character's wall time went, plus rolling gains per hour."""
+        wall = self.clock.monotonic() - self.started
+        http = self.total("http_request_seconds", character=character)
+        queued = self.total("rate_limit_wait_seconds", character=character)
+        cooldown = self.total("cooldown_wait_seconds", character=character)
+        return {
+            "wall_seconds": round(wall, 1),
+            "cooldown_share": round(cooldown / wall, 3),
+            "http_share": round(http / wall, 3),
+            "rate_limit_share": round(queued / wall, 3),
+            "other_share": round(max(0.0, wall - http - queued - cooldown) / wall, 3),
+            "actions": int(self.total("actions_total", character=character)),
+            "retries": int(self.total("action_retries_total", character=character)),
+            "xp_per_hour": round(self.per_hour("xp_total", character=character), 1),
+            "items_per_hour": round(self.per_hour("items_total", character=character), 1),
+            "gold_per_hour": round(self.per_hour("gold_total", character=character), 1),
+        }
+
+    def task_summary(self) -> dict[str, dict]:
+        summary = {}
+        for name, labels in list(self.totals):
+            task = dict(labels).get("task")
+            if task and name in ("xp_total", "items_total", "gold_total", "kills_total") and task not in summary:
+                summary[task] = {
+                    metric.removesuffix("_total") + "_per_hour": round(self.per_hour(metric, task=task), 1)
+                    for metric in ("xp_total", "items_total", "gold_total", "kills_total")
+                }
+        return summary
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, description) in HELP.items():
+            keys = [key for key in self.totals if key[0] == name]
+            if not keys:
+                continue
+            lines += [f"# HELP artifacts_{name} {description}", f"# TYPE artifacts_{name} {kind}"]
+            for key in sorted(keys):
+                labels = key[1]
+                if kind == "counter":
+                    lines.append(f"artifacts_{name}{_format_labels(labels)} {self.totals[key]:g}")
+                    continue
+                values = sorted(value for _, value in self.recent[key])
+                for q in QUANTILES:
+                    if values:
+                        value = values[min(len(values) - 1, math.ceil(q * len(values)) - 1)]
+                        lines.append(f"artifacts_{name}{_format_labels(labels, quantile=q)} {value:g}")
+                lines.append(f"artifacts_{name}_sum{_format_labels(labels)} {self.totals[key]:g}")
+                lines.append(f"artifacts_{name}_count{_format_labels(labels)} {self.counts[key]}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Atomically write the metrics for a node_exporter textfile collector."""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(file.name, path)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9108) -> web.AppRunner:
+        """Expose ``/metrics`` over HTTP; clean up with ``await runner.cleanup()``."""
+
+        async def metrics(request):
+            return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
@@ -0,0 +1,134 @@
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from CombatSimulator import Analytic
+from CombatSimulator.Fighters import FighterStats
+from api.Catalog import Catalog
+from api.SpatialIndex import distance
+from character.Character import Character
+from utils import Locations
+
+MOVE_SECONDS_PER_TILE = 5
+GATHER_SECONDS = 25
+FIGHT_SECONDS_PER_TURN = 2
+CRAFT_SECONDS = 10
+# travel is paid once per trip, spread over this many units
+DEFAULT_BATCH = 10
+
+
+@dataclass(frozen=True)
+class Source:
+    kind: str  # "monster", "resource" or "craft"
+    code: str  # monster, resource or item code
+    tile: dict | None
+    unit_seconds: float
+    travel_seconds: float
+
+    def seconds(self, quantity: int = 1) -> float:
+        return self.travel_seconds + quantity * self.unit_seconds
+
+
+def _expected_quantity(drop: dict) -> float:
+    # a drop with rate N comes with a 1 in N chance per action
+    return (drop["min_quantity"] + drop["max_quantity"]) / 2 / drop["rate"]
+
+
+class AcquisitionCostModel:
+    """Expected seconds of cooldown to obtain an item from each of its sources.
+
+    Monsters are weighed by their drop rates and the character's exact win probability,
+    resources by their drop rates and the character's skill levels, crafts by the cost
+    of their cheapest ingredients. Every source also pays a round trip from ``origin``,
+    amortized over ``batch`` units. All sources are ranked for the whole catalog once.
+    """
+
+    # models of recently seen character states, least recently used dropped first
+    _models: OrderedDict[tuple, "AcquisitionCostModel"] = OrderedDict()
+    MODELS_LIMIT = 64
+
+    def __init__(self, catalog: Catalog, stats: FighterStats | None = None, skills: dict[str, int] | None = None,
+                 origin: tuple[int, int] = Locations.BANK.value, batch: int = DEFAULT_BATCH):
+        self.catalog = catalog
+        self.stats = stats
+        self.skills = skills
+        self.origin = origin
+        self.batch = batch
+        self.ranked: dict[str, list[Source]] = {}
+        for code in catalog.items_by_code:
+            self._rank(code)
+
+    @classmethod
+    def for_character(cls, catalog: Catalog, character: Character) -> "AcquisitionCostModel":
+        stats = FighterStats.from_character(character)
+        skills = {skill.name: skill.level for skill in character.skills}
+        key = (catalog.version, stats, tuple(sorted(skills.items())))
+        if (model := cls._models.get(key)) is None:
+            model = cls._models[key] = cls(catalog, stats, skills)
+            if len(cls._models) > cls.MODELS_LIMIT:
+                cls._models.popitem(last=False)
+        else:
+            cls._models.move_to_end(key)
+        return model
+
+    def sources(self, code: str) -> list[Source]:
+        """Every feasible source of the item, cheapest first."""
+        return self.ranked.get(code, [])
+
+    def cheapest(self, code: str, kinds: tuple[str, ...] | None = None) -> Source | None:
+        return next((source for source in self.sources(code) if kinds is None or source.kind in kinds), None)
+
+    def unit_cost(self, code: str) -> float:
+        """Expected seconds per unit when fetched ``batch`` at a time, ``inf`` if unobtainable."""
+        source = self.cheapest(code)
+        return self._amortized(source) if source else math.inf
+
+    def fight(self, monster: dict) -> tuple[float, float]:
+        """Win probability and expected cooldown seconds of one fight against the monster."""
+        if self.stats is None:
+            return 1.0, FIGHT_SECONDS_PER_TURN
+        outcome = Analytic.solve(self.stats, FighterStats.from_monster(monster))
+        return outcome["win_probability"], outcome["avg_turns"] * FIGHT_SECONDS_PER_TURN
+
+    def _amortized(self, source: Source) -> float:
+        return source.seconds(self.batch) / self.batch
+
+    def _travel(self, content: str) -> tuple[dict | None, float]:
+        if not (tile := self.catalog.index.nearest(self.origin, content=content)):
+            return None, math.inf
+        return tile, 2 * distance(self.origin, (tile["x"], tile["y"])) * MOVE_SECONDS_PER_TILE
+
+    def _has_level(self, skill: str, level: int) -> bool:
+        return self.skills is None or self.skills.get(skill, 0) >= level
+
+    def _rank(self, code: str) -> list[Source]:
+        if code in self.ranked:
+            return self.ranked[code]
+        # recipes form a DAG, the placeholder only guards against malformed data
+        self.ranked[code] = []
+        sources = []
+        for monster in self.catalog.monsters_dropping(code):
+            win_probability, seconds = self.fight(monster)
+            per_fight = win_probability * sum(_expected_quantity(d) for d in monster["drops"] if d["code"] == code)
+            tile, travel = self._travel(monster["code"])
+            if per_fight > 1e-9 and tile:
+                sources.append(Source("monster", monster["code"], tile, seconds / per_fight, travel))
+        for resource in self.catalog.resources_dropping(code):
+            if not self._has_level(resource["skill"], resource["level"]):
+                continue
+            per_gather = sum(_expected_quantity(d) for d in resource["drops"] if d["code"] == code)
+            tile, travel = self._travel(resource["code"])
+            if per_gather > 0 and tile:
+                sources.append(Source("resource", resource["code"], tile, GATHER_SECONDS / per_gather, travel))
+        craft = self.catalog.item(code).get("craft")
+        if craft and self._has_level(craft["skill"], craft["level"]):
+            ingredients = 0.0
+            for part in craft["items"]:
+                self._rank(part["code"])
+                ingredients += part["quantity"] * self.unit_cost(part["code"])
+            tile, travel = self._travel(craft["skill"])
+            if ingredients < math.inf and tile:
+                yields = craft.get("quantity") or 1
+                sources.append(Source("craft", code, tile, (ingredients + CRAFT_SECONDS) / yields, travel))
+        self.ranked[code] = sorted(sources, key=self._amortized)
+        return self.ranked[code]
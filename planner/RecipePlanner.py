@@ -0,0 +1,132 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from api.Catalog import Catalog
+
+
+@dataclass(frozen=True)
+class Recipe:
+    code: str
+    skill: str
+    level: int
+    yields: int
+    ingredients: tuple[tuple[str, int], ...]
+
+
+@dataclass
+class CraftStep:
+    code: str
+    skill: str
+    crafts: int
+    units: int
+
+
+@dataclass
+class CraftingPlan:
+    targets: dict[str, int]
+    withdrawals: dict[str, int] = field(default_factory=dict)
+    from_inventory: dict[str, int] = field(default_factory=dict)
+    gathers: dict[str, int] = field(default_factory=dict)
+    crafts: list[CraftStep] = field(default_factory=list)
+    raw_materials: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def bank_trips(self) -> int:
+        return 1 if self.withdrawals else 0
+
+    @property
+    def crafting_sessions(self) -> int:
+        # consecutive crafts at the same workbench share one trip there
+        return sum(1 for i, step in enumerate(self.crafts) if i == 0 or self.crafts[i - 1].skill != step.skill)
+
+    def __str__(self):
+        return (
+            f'withdraw {self.withdrawals or "nothing"}, gather {self.gathers or "nothing"}, '
+            f'craft {[f"{step.crafts}x{step.code}" for step in self.crafts]} '
+            f'({self.bank_trips} bank trips, {self.crafting_sessions} crafting sessions)'
+        )
+
+
+class RecipePlanner:
+    """Resolves crafting targets into a full material plan up front.
+
+    Recipes are expanded once per item code into a dependency DAG; a plan walks the
+    DAG parents-first so every item's total demand is known before it is taken from
+    the inventory, then the bank, then gathered or crafted.
+    """
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        self._recipes: dict[str, Recipe | None] = {}
+        self._heights: dict[str, int] = {}
+
+    def recipe(self, code: str) -> Recipe | None:
+        if code not in self._recipes:
+            craft = self.catalog.item(code).get("craft")
+            self._recipes[code] = Recipe(
+                code=code,
+                skill=craft["skill"],
+                level=craft["level"],
+                yields=craft.get("quantity") or 1,
+                ingredients=tuple((part["code"], part["quantity"]) for part in craft["items"])
+            ) if craft else None
+        return self._recipes[code]
+
+    def height(self, code: str) -> int:
+        """Longest chain of crafts below the item, 0 for raw materials."""
+        if code not in self._heights:
+            recipe = self.recipe(code)
+            self._heights[code] = 1 + max(self.height(part) for part, _ in recipe.ingredients) if recipe else 0
+        return self._heights[code]
+
+    def topological_order(self, targets) -> list[str]:
+        order, seen = [], set()
+
+        def visit(code):
+            if code in seen:
+                return
+            seen.add(code)
+            if recipe := self.recipe(code):
+                for part, _ in recipe.ingredients:
+                    visit(part)
+            order.append(code)
+
+        for code in targets:
+            visit(code)
+        return order[::-1]
+
+    def plan(self, targets: dict[str, int], inventory: dict[str, int] | None = None,
+             bank: dict[str, int] | None = None) -> CraftingPlan:
+        inventory, bank = dict(inventory or {}), dict(bank or {})
+        plan = CraftingPlan(targets=dict(targets))
+        demand = defaultdict(int, targets)
+        crafts = []
+        for code in self.topological_order(targets):
+            # the target items themselves are always crafted, stock only covers ingredients
+            needed = demand[code]
+            if code not in targets:
+                if taken := min(needed, inventory.get(code, 0)):
+                    plan.from_inventory[code] = taken
+                    needed -= taken
+                if withdrawn := min(needed, bank.get(code, 0)):
+                    plan.withdrawals[code] = withdrawn
+                    needed -= withdrawn
+            if needed <= 0:
+                continue
+            if recipe := self.recipe(code):
+                count = math.ceil(needed / recipe.yields)
+                crafts.append(CraftStep(code, recipe.skill, count, count * recipe.yields))
+                for part, quantity in recipe.ingredients:
+                    demand[part] += count * quantity
+            else:
+                plan.gathers[code] = needed
+        for code, quantity in plan.gathers.items():
+            plan.raw_materials[code] = quantity
+        for stock in (plan.from_inventory, plan.withdrawals):
+            for code, quantity in stock.items():
+                if not self.recipe(code):
+                    plan.raw_materials[code] = plan.raw_materials.get(code, 0) + quantity
+        # ingredients before the items made from them, same-bench crafts next to each other
+        plan.crafts = sorted(crafts, key=lambda step: (self.height(step.code), step.skill))
+        return plan
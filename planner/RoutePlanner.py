@@ -0,0 +1,124 @@
+import copy
+import itertools
+from dataclasses import dataclass
+
+from api.Catalog import Catalog
+from api.SpatialIndex import distance
+from character.Tasks import DepositTask, FightTask, GatherTask, Task
+from planner.AcquisitionCost import MOVE_SECONDS_PER_TILE
+
+# segments up to this many free steps are ordered exhaustively, longer ones greedily
+MAX_EXACT_STEPS = 7
+
+
+@dataclass
+class Route:
+    tasks: list[Task]
+    tiles: list[dict]
+    travel_seconds: float
+    original_seconds: float
+
+
+class RoutePlanner:
+    """Reorders one character's task cycle to spend less time moving.
+
+    Fights and gathers may run in any order, so they are merged per target and ordered
+    to minimize travel; deposits collapse into one bank trip at the end of their stretch;
+    crafts and withdrawals keep their place since they depend on what came before.
+    Every step goes to the nearest of the equivalent tiles (any bank, any spawn of the
+    monster...), picked exactly for a given order by a shortest path over the candidates.
+    """
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+
+    def candidates(self, task: Task) -> list[dict]:
+        x, y = task.location.value
+        if (tile := self.catalog.index.at((x, y))) and tile["content"]:
+            return self.catalog.index.tiles(content=tile["content"]["code"])
+        return [{"name": task.location.name, "x": x, "y": y, "content": None}]
+
+    @staticmethod
+    def segments(tasks: list[Task]) -> list[tuple[list[Task], list[Task]]]:
+        """Split the cycle into (free steps, fixed tail) stretches, merging repeated targets."""
+        segments = []
+        free, merged, deposit = [], {}, None
+        for task in tasks:
+            if isinstance(task, DepositTask):
+                deposit = deposit or task
+            elif isinstance(task, (FightTask, GatherTask)):
+                key = (type(task), task.item, task.monster and task.monster["code"])
+                if key in merged:
+                    # merge into a copy, the caller's tasks keep their own quantities
+                    combined = copy.copy(merged[key])
+                    combined.quantity += task.quantity
+                    free[free.index(merged[key])] = merged[key] = combined
+                else:
+                    merged[key] = task
+                    free.append(task)
+            else:
+                segments.append((free, [deposit, task] if deposit else [task]))
+                free, merged, deposit = [], {}, None
+        if free or deposit:
+            segments.append((free, [deposit] if deposit else []))
+        return segments
+
+    def _walk(self, tasks, states: dict[tuple[int, int], tuple[int, tuple]]):
+        # states: position -> (tiles travelled so far, tiles visited), one entry per reachable end tile
+        for task in tasks:
+            following = {}
+            for tile in self.candidates(task):
+                position = (tile["x"], tile["y"])
+                travelled, path = min(
+                    ((cost + distance(start, position), path) for start, (cost, path) in states.items()),
+                    key=lambda state: state[0]
+                )
+                following[position] = (travelled, path + (tile,))
+            states = following
+        return states
+
+    def _nearest_first(self, tasks: list[Task], position: tuple[int, int]) -> list[Task]:
+        order, remaining = [], list(tasks)
+        while remaining:
+            task = min(remaining, key=lambda t: min(distance(position, (c["x"], c["y"])) for c in self.candidates(t)))
+            tile = min(self.candidates(task), key=lambda c: distance(position, (c["x"], c["y"])))
+            position = (tile["x"], tile["y"])
+            order.append(task)
+            remaining.remove(task)
+        return order
+
+    def plan(self, tasks: list[Task], origin: tuple[int, int], cyclic: bool = True) -> Route:
+        original = sum(distance(a, b) for a, b in itertools.pairwise(
+            [origin, *(tuple(task.location.value) for task in tasks), *([origin] if cyclic else [])]
+        ))
+        segments = self.segments(tasks)
+        states = {origin: (0, ())}
+        ordered = []
+        for index, (free, tail) in enumerate(segments):
+            closing = cyclic and index == len(segments) - 1
+
+            def total(end_states):
+                return min(cost + (distance(position, origin) if closing else 0)
+                           for position, (cost, _) in end_states.items())
+
+            if len(free) <= MAX_EXACT_STEPS:
+                orders = itertools.permutations(free)
+            else:
+                orders = [self._nearest_first(free, min(states, key=lambda p: states[p][0]))]
+            best = min(((order, self._walk([*order, *tail], states)) for order in orders),
+                       key=lambda candidate: total(candidate[1]))
+            ordered += [*best[0], *tail]
+            states = best[1]
+
+        closing_cost = (lambda position: distance(position, origin)) if cyclic else (lambda position: 0)
+        end = min(states, key=lambda position: states[position][0] + closing_cost(position))
+        travelled, tiles = states[end]
+        ordered = [copy.copy(task) for task in ordered]
+        for task, tile in zip(ordered, tiles):
+            task.location = task.client.tile_location(tile)
+        return Route(
+            tasks=ordered,
+            tiles=list(tiles),
+            travel_seconds=(travelled + closing_cost(end)) * MOVE_SECONDS_PER_TILE,
+            original_seconds=original * MOVE_SECONDS_PER_TILE
+        )
@@ -0,0 +1,90 @@
+import itertools
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from CombatSimulator import Analytic, MonteCarlo
+from CombatSimulator.Fighters import FighterStats, character_hits, monster_hits
+from mock.MockServer import FIXTURE, MockServer, load_catalog
+
+# close enough that both sides win some of the time, and blocks on both sides
+CHARACTER = FighterStats(hp=60, attack=(6, 0, 5, 0), damage=(0, 0, 10, 0), resistance=(20, 0, 0, 40))
+MONSTER = FighterStats(hp=52, attack=(0, 4, 0, 5), damage=(0, 0, 0, 0), resistance=(30, 0, 60, 0))
+
+
+def brute_force(character: FighterStats, monster: FighterStats, max_turns: int = 30) -> dict:
+    """Walk every combination of blocked and landed hits, strike by strike."""
+    attacks = (max_turns + 1) // 2
+    outcomes = {
+        side: [(sum(damage for (damage, _), landed in zip(hits, pattern) if landed),
+                np.prod([1 - chance if landed else chance for (_, chance), landed in zip(hits, pattern)]))
+               for pattern in itertools.product((True, False), repeat=len(hits))]
+        for side, hits in (("dealt", character_hits(character, monster)), ("taken", monster_hits(monster, character)))
+    }
+
+    @lru_cache(maxsize=None)
+    def fight(monster_hp: int, character_hp: int, strike: int) -> tuple[float, float, float]:
+        """(P(win), P(loss), E[turns]) from the character's ``strike``-th strike on."""
+        if strike > attacks:
+            return 0.0, 0.0, 2 * attacks + 1
+        win = loss = turns = 0.0
+        for dealt, p in outcomes["dealt"]:
+            if dealt >= monster_hp:
+                win, turns = win + p, turns + p * 2 * strike
+                continue
+            for taken, q in outcomes["taken"]:
+                if taken >= character_hp:
+                    loss, turns = loss + p * q, turns + p * q * (2 * strike + 1)
+                    continue
+                later = fight(monster_hp - dealt, character_hp - taken, strike + 1)
+                win, loss, turns = win + p * q * later[0], loss + p * q * later[1], turns + p * q * later[2]
+        return win, loss, turns
+
+    win, loss, turns = fight(monster.hp, character.hp, 1)
+    return {"win_probability": win, "loss_probability": loss, "avg_turns": turns}
+
+
+def test_solve_matches_brute_force_on_a_close_fight():
+    exact = brute_force(CHARACTER, MONSTER)
+    outcome = Analytic.solve(CHARACTER, MONSTER, max_turns=30)
+
+    assert 0.05 < exact["win_probability"] < 0.95
+    for key in ("win_probability", "loss_probability", "avg_turns"):
+        assert outcome[key] == pytest.approx(exact[key], abs=1e-9), key
+
+
+def test_solve_counts_a_fight_that_runs_out_of_turns_as_a_timeout():
+    outcome = Analytic.solve(CHARACTER, MONSTER, max_turns=18)
+    exact = brute_force(CHARACTER, MONSTER, max_turns=18)
+
+    assert outcome["timeout_probability"] > 0
+    assert outcome["timeout_probability"] == pytest.approx(1 - exact["win_probability"] - exact["loss_probability"])
+    assert outcome["win_probability"] == pytest.approx(exact["win_probability"], abs=1e-9)
+
+
+def test_solve_agrees_with_seeded_monte_carlo_on_fixture_monsters():
+    server = MockServer(load_catalog(FIXTURE))
+    character = server.fighter_stats(next(iter(server.characters.values())))
+
+    for code in ("chicken", "cow", "wolf"):
+        monster = FighterStats.from_monster(server.monsters[code])
+        outcome = Analytic.solve(character, monster)
+        sampled = MonteCarlo.simulate(character, monster, trials=20000, rng=np.random.default_rng(7))
+        low, high = sampled["confidence_interval"]
+
+        assert low - 1e-9 <= outcome["win_probability"] <= high + 1e-9, code
+        assert outcome["avg_turns"] == pytest.approx(sampled["avg_turns"], rel=0.02), code
+
+
+def test_deterministic_strikes_use_the_closed_form():
+    character = FighterStats(hp=100, attack=(10, 0, 0, 0), damage=(0, 0, 0, 0), resistance=(0, 0, 0, 0))
+    monster = FighterStats(hp=35, attack=(0, 0, 0, 7), damage=(0, 0, 0, 0), resistance=(0, 0, 0, 0))
+
+    outcome = Analytic.solve(character, monster)
+
+    # four strikes to kill, three monster strikes taken before the last one lands
+    assert outcome["all_wins"]
+    assert outcome["avg_turns"] == 8
+    assert outcome["character_hp"] == 100 - 3 * 7
+    assert outcome["monster_hp"] == 35 - 4 * 10
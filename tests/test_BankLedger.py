@@ -0,0 +1,68 @@
+from api.BankLedger import BankLedger
+
+
+def ledger(**items: int) -> BankLedger:
+    bank = BankLedger()
+    bank.load([{"code": code, "quantity": quantity} for code, quantity in items.items()])
+    return bank
+
+
+def test_reservations_never_promise_more_than_the_bank_holds():
+    bank = ledger(copper=10)
+
+    assert bank.reserve("Samriel", "copper", 7) == 7
+    assert bank.reserve("Miriel", "copper", 7) == 3
+    assert bank.reserve("Habib", "copper", 1) == 0
+    assert bank.available("copper") == 0
+    # an owner still sees what it reserved itself
+    assert bank.available("copper", owner="Samriel") == 7
+
+
+def test_reserving_again_only_adds_what_is_left():
+    bank = ledger(copper=10)
+
+    bank.reserve("Samriel", "copper", 4)
+    assert bank.reserve("Samriel", "copper", 10) == 6
+    assert bank.reserved("copper") == 10
+
+
+def test_withdrawing_more_than_is_banked_does_not_go_negative():
+    bank = ledger(copper=3)
+    bank.reserve("Samriel", "copper", 3)
+
+    bank.apply({"data": {}}, "copper", -5)
+    bank.release("Samriel", "copper", 5)
+
+    assert bank.quantity("copper") == 0
+    assert bank.items() == []
+    assert bank.reserved("copper") == 0
+    assert bank.reserve("Miriel", "copper", 1) == 0
+
+
+def test_partial_release_keeps_the_rest_reserved():
+    bank = ledger(copper=10)
+    bank.reserve("Samriel", "copper", 6)
+
+    bank.apply({"data": {}}, "copper", -2)
+    bank.release("Samriel", "copper", 2)
+
+    assert bank.quantity("copper") == 8
+    assert bank.reserved("copper") == 4
+    assert bank.available("copper") == 4
+
+
+def test_a_rejected_withdrawal_marks_the_ledger_stale():
+    bank = ledger(copper=10)
+
+    bank.apply({"error": {"code": 478, "message": "Missing item or insufficient quantity."}}, "copper", -10)
+
+    assert not bank.is_fresh()
+    assert bank.quantity("copper") == 10
+
+
+def test_a_bank_listing_in_the_response_replaces_the_counts():
+    bank = ledger(copper=10)
+
+    bank.apply({"data": {"bank": [{"code": "iron", "quantity": 2}]}}, "iron", 2)
+
+    assert bank.items() == [{"code": "iron", "quantity": 2}]
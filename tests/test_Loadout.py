@@ -0,0 +1,77 @@
+import itertools
+import math
+from collections import Counter
+
+import pytest
+
+from CombatSimulator import Analytic
+from CombatSimulator.Fighters import FighterStats
+from CombatSimulator.Loadout import COMBAT_SLOTS, SLOT_TYPES, Candidate, LoadoutSearch, add_vectors, item_vector
+from mock.MockServer import FIXTURE, load_catalog
+
+# a character with nothing on, weak enough that the gear decides the fight
+BASE = FighterStats(hp=60, attack=(4, 0, 0, 0), damage=(0, 0, 0, 0), resistance=(0, 0, 0, 0))
+WEAPONS = ("wooden_stick", "copper_dagger", "iron_axe", "spruce_fishing_rod", "multislimes_sword", "forest_whip")
+
+
+def fixture_candidates(rings: int) -> dict[str, list[Candidate]]:
+    items = load_catalog(FIXTURE)["items"]
+    candidates = {}
+    for item in items:
+        if item["type"] in ("shield", "helmet", "boots", "ring", "amulet") or item["code"] in WEAPONS:
+            available = rings if item["type"] == "ring" else math.inf
+            candidates.setdefault(item["type"], []).append(
+                Candidate(item["code"], item_vector(item), "bank", available)
+            )
+    return candidates
+
+
+def fixture_monster(code: str) -> FighterStats:
+    return FighterStats.from_monster(next(m for m in load_catalog(FIXTURE)["monsters"] if m["code"] == code))
+
+
+def score(stats: FighterStats, monster: FighterStats) -> tuple:
+    outcome = Analytic.solve(stats, monster)
+    return round(outcome["win_probability"], 9), -outcome["avg_turns"], outcome["character_hp"]
+
+
+def brute_force(base: FighterStats, monster: FighterStats, candidates: dict[str, list[Candidate]]) -> tuple:
+    """Best score over every way to fill every slot, copies permitting."""
+    per_slot = [[None, *candidates.get(SLOT_TYPES[slot], [])] for slot in COMBAT_SLOTS]
+    best = None
+    for picks in itertools.product(*per_slot):
+        worn = [pick for pick in picks if pick]
+        copies = Counter(pick.code for pick in worn)
+        if any(copies[pick.code] > pick.available for pick in worn):
+            continue
+        stats = base
+        for pick in worn:
+            stats = add_vectors(stats, pick.vector)
+        if best is None or score(stats, monster) > best:
+            best = score(stats, monster)
+    return best
+
+
+@pytest.mark.parametrize("monster_code", ["cow", "wolf", "skeleton", "pig"])
+@pytest.mark.parametrize("rings", [1, 2])
+def test_search_finds_the_brute_force_optimum(monster_code, rings):
+    monster = fixture_monster(monster_code)
+    candidates = fixture_candidates(rings)
+
+    loadout = LoadoutSearch(BASE, monster, candidates, time_budget=60).search()
+
+    assert loadout.complete
+    # stripping stats the fight ignores can move the last float digit, nothing more
+    assert score(loadout.stats, monster) == pytest.approx(brute_force(BASE, monster, candidates), rel=1e-9)
+    worn = Counter(code for code in loadout.items.values() if code)
+    assert all(count <= rings for code, count in worn.items() if code.endswith("_ring"))
+
+
+def test_search_evaluates_fewer_loadouts_than_brute_force():
+    monster = fixture_monster("wolf")
+    candidates = fixture_candidates(rings=2)
+    every_loadout = math.prod(len(candidates.get(SLOT_TYPES[slot], [])) + 1 for slot in COMBAT_SLOTS)
+
+    loadout = LoadoutSearch(BASE, monster, candidates, time_budget=60).search()
+
+    assert loadout.evaluations < every_loadout
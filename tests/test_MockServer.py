@@ -0,0 +1,29 @@
+from CombatSimulator import Analytic
+from CombatSimulator.Fighters import FighterStats
+from api.CatalogCache import CatalogCache
+from mock.MockServer import FIXTURE, MockServer, load_catalog
+
+# every monster the production line in main.py sends its suppliers after
+MAIN_MONSTERS = ("cow", "pig", "skeleton", "flying_serpent", "wolf")
+
+
+def test_load_catalog_reads_a_catalog_cache_snapshot(tmp_path):
+    fixture = load_catalog(FIXTURE)
+    cache = CatalogCache(str(tmp_path / "catalog.pickle"))
+    cache.save("v1.2", **{key: fixture[key] for key in ("tiles", "monsters", "resources", "items")})
+
+    catalog = load_catalog(cache.path)
+
+    assert catalog["version"] == "v1.2"
+    for key in ("tiles", "monsters", "resources", "items"):
+        assert catalog[key] == fixture[key]
+    assert MockServer(catalog).characters
+
+
+def test_seeded_characters_beat_the_main_scenario_monsters():
+    server = MockServer(load_catalog(FIXTURE))
+
+    for character in server.characters.values():
+        for code in MAIN_MONSTERS:
+            outcome = Analytic.solve(server.fighter_stats(character), FighterStats.from_monster(server.monsters[code]))
+            assert outcome["win_probability"] > 0.99, (character["name"], code)
@@ -0,0 +1,72 @@
+from api.Catalog import Catalog
+from planner.RecipePlanner import RecipePlanner
+
+
+def item(code: str, skill: str | None = None, level: int = 1, quantity: int = 1, **ingredients: int) -> dict:
+    craft = {
+        "skill": skill, "level": level, "quantity": quantity,
+        "items": [{"code": part, "quantity": count} for part, count in ingredients.items()]
+    } if skill else None
+    return {"code": code, "type": "resource" if not skill else "weapon", "level": level, "craft": craft}
+
+
+# copper_bar is shared by both targets, so its demand has to be summed before it is crafted
+CATALOG = Catalog(tiles=[], monsters=[], resources=[], items=[
+    item("copper_ore"),
+    item("ash_wood"),
+    item("copper_bar", "mining", copper_ore=10),
+    item("ash_plank", "woodcutting", quantity=2, ash_wood=5),
+    item("copper_dagger", "weaponcrafting", copper_bar=6),
+    item("wooden_shield", "gearcrafting", ash_plank=3, copper_bar=2),
+])
+
+
+def test_every_item_comes_after_the_items_made_from_it():
+    order = RecipePlanner(CATALOG).topological_order(["copper_dagger", "wooden_shield"])
+
+    assert set(order) == {"copper_ore", "ash_wood", "copper_bar", "ash_plank", "copper_dagger", "wooden_shield"}
+    for later, earlier in [("copper_bar", "copper_dagger"), ("copper_bar", "wooden_shield"),
+                           ("ash_plank", "wooden_shield"), ("copper_ore", "copper_bar"), ("ash_wood", "ash_plank")]:
+        assert order.index(earlier) < order.index(later)
+
+
+def test_shared_ingredients_are_crafted_once_for_every_target():
+    plan = RecipePlanner(CATALOG).plan({"copper_dagger": 1, "wooden_shield": 1})
+
+    steps = {step.code: step for step in plan.crafts}
+    assert steps["copper_bar"].crafts == 8
+    # three planks at two per craft
+    assert (steps["ash_plank"].crafts, steps["ash_plank"].units) == (2, 4)
+    assert plan.gathers == {"copper_ore": 80, "ash_wood": 10}
+    assert plan.raw_materials == plan.gathers
+    assert plan.withdrawals == {} and plan.bank_trips == 0
+
+
+def test_crafts_are_ordered_ingredients_first():
+    plan = RecipePlanner(CATALOG).plan({"copper_dagger": 1, "wooden_shield": 1})
+
+    position = {step.code: i for i, step in enumerate(plan.crafts)}
+    assert position["copper_bar"] < position["copper_dagger"]
+    assert position["copper_bar"] < position["wooden_shield"]
+    assert position["ash_plank"] < position["wooden_shield"]
+
+
+def test_inventory_then_bank_cover_ingredients_before_gathering():
+    plan = RecipePlanner(CATALOG).plan(
+        {"copper_dagger": 1}, inventory={"copper_bar": 2, "copper_dagger": 5}, bank={"copper_bar": 3, "copper_ore": 4}
+    )
+
+    # the dagger in the inventory does not count, targets are always crafted
+    assert [(step.code, step.crafts) for step in plan.crafts] == [("copper_bar", 1), ("copper_dagger", 1)]
+    assert plan.from_inventory == {"copper_bar": 2}
+    assert plan.withdrawals == {"copper_bar": 3, "copper_ore": 4}
+    assert plan.gathers == {"copper_ore": 6}
+    assert plan.raw_materials == {"copper_ore": 10}
+
+
+def test_bank_stock_of_an_intermediate_skips_its_whole_subtree():
+    plan = RecipePlanner(CATALOG).plan({"wooden_shield": 2}, bank={"ash_plank": 6, "copper_bar": 10})
+
+    assert [step.code for step in plan.crafts] == ["wooden_shield"]
+    assert plan.withdrawals == {"ash_plank": 6, "copper_bar": 4}
+    assert plan.gathers == {} and plan.raw_materials == {}
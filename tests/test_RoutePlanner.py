@@ -0,0 +1,101 @@
+import asyncio
+import itertools
+import os
+import socket
+import tempfile
+
+import pytest
+
+from api.ArtifactsAPI import ArtifactsAPI
+from api.SpatialIndex import distance
+from character.Tasks import DepositTask, FightTask, GatherTask
+from characters import characters
+from jobs.JobQueue import Job, JobQueue
+from mock.MockServer import FIXTURE, MockServer, load_catalog
+from mock.Simulation import serve_in_thread
+from planner.AcquisitionCost import MOVE_SECONDS_PER_TILE
+from planner.RoutePlanner import RoutePlanner
+from utils import Locations
+
+ORIGIN = Locations.BANK.value
+
+
+@pytest.fixture(scope="module")
+def client():
+    if not ArtifactsAPI.is_initialized():
+        with socket.socket() as probe:
+            probe.bind(("localhost", 0))
+            port = probe.getsockname()[1]
+        serve_in_thread(MockServer(load_catalog(FIXTURE)), port=port)
+        os.environ["API_ROOT_URL"] = f"http://localhost:{port}"
+        # the fixture catalog must not replace the real game's cached snapshot
+        with tempfile.TemporaryDirectory() as cache:
+            ArtifactsAPI.initialize(catalog_cache_path=os.path.join(cache, "catalog.pickle"))
+    return ArtifactsAPI.instance()
+
+
+def zigzag_cycle():
+    """A standing loop written in the order it came to mind, crossing the map between every step."""
+    character = characters[0]
+    tasks = []
+    for task in (FightTask(character, 20, "pig"), FightTask(character, 20, "skeleton"),
+                 FightTask(character, 20, "wolf"), GatherTask(character, 30, "coal"),
+                 FightTask(character, 20, "flying_serpent"), FightTask(character, 10, "pig")):
+        tasks += [task, DepositTask(character)]
+    return tasks
+
+
+def fights(tasks, monster: str) -> list[int]:
+    return [task.quantity for task in tasks if isinstance(task, FightTask) and task.monster["code"] == monster]
+
+
+def shortest_cycle(planner: RoutePlanner, steps, bank) -> float:
+    """Every order of the steps and every tile each could use, then one bank trip and back."""
+    best = float("inf")
+    for order in itertools.permutations(steps):
+        for tiles in itertools.product(*(planner.candidates(step) for step in [*order, bank])):
+            stops = [ORIGIN, *((tile["x"], tile["y"]) for tile in tiles), ORIGIN]
+            best = min(best, sum(distance(a, b) for a, b in itertools.pairwise(stops)))
+    return best * MOVE_SECONDS_PER_TILE
+
+
+def test_a_cycle_is_routed_shorter_than_its_input_order(client):
+    tasks = zigzag_cycle()
+
+    route = RoutePlanner(client.catalog).plan(tasks, origin=ORIGIN, cyclic=True)
+
+    assert route.travel_seconds < route.original_seconds
+    # the two pig fights are merged, the deposits collapse into one bank trip at the end
+    assert len(route.tasks) == 6 and isinstance(route.tasks[-1], DepositTask)
+    assert fights(route.tasks, "pig") == [30]
+    assert fights(tasks, "pig") == [20, 10]
+    assert client.catalog.index.at(route.tasks[-1].location.value)["content"]["type"] == "bank"
+
+
+def test_a_short_cycle_is_routed_exactly(client):
+    planner = RoutePlanner(client.catalog)
+    tasks = zigzag_cycle()
+    steps = [step for free, _ in planner.segments(tasks) for step in free]
+
+    route = planner.plan(tasks, origin=ORIGIN, cyclic=True)
+
+    assert route.travel_seconds == shortest_cycle(planner, steps, tasks[-1])
+
+
+def test_standing_orders_a_character_is_best_placed_for_are_taken_as_one_round(client):
+    async def load():
+        try:
+            await client.get_all_characters_data()
+        finally:
+            await client.transport.close()
+
+    asyncio.run(load())
+    queue = JobQueue(characters[:1])
+    standing = [Job("fight", monster, 20, repeat=True) for monster in ("pig", "skeleton", "wolf")]
+    queue.submit(*standing)
+
+    picked = queue._pick(characters[0])
+
+    assert {job.code for job, _, _ in picked} == {"pig", "skeleton", "wolf"}
+    queue.submit(supply := Job("gather", "coal", 10, priority=1))
+    assert [job for job, _, _ in queue._pick(characters[0])] == [supply]
@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timezone
+
+from api.Clock import VirtualClock
+from api.Scheduler import Scheduler
+
+
+def test_next_ready_orders_characters_by_cooldown_left():
+    scheduler = Scheduler(VirtualClock())
+    scheduler.set_cooldown("Samriel", 5)
+    scheduler.set_cooldown("Miriel", 2)
+    scheduler.set_cooldown("Habib", 8)
+
+    assert scheduler.next_ready(["Samriel", "Miriel", "Habib"]) == "Miriel"
+    assert scheduler.next_ready(["Samriel", "Habib"]) == "Samriel"
+    # never seen means ready now
+    assert scheduler.next_ready(["Samriel", "Mitsu"]) == "Mitsu"
+
+
+def test_characters_come_off_cooldown_in_order():
+    clock = VirtualClock()
+    scheduler = Scheduler(clock)
+    cooldowns = {"Samriel": 5, "Miriel": 2, "Habib": 8}
+    for name, seconds in cooldowns.items():
+        scheduler.set_cooldown(name, seconds)
+
+    async def drain():
+        order, waiting = [], list(cooldowns)
+        while waiting:
+            name = await scheduler.wait_any(waiting)
+            assert clock.monotonic() >= cooldowns[name]
+            order.append(name)
+            waiting.remove(name)
+        return order
+
+    assert asyncio.run(drain()) == ["Miriel", "Samriel", "Habib"]
+    assert scheduler.is_ready("Habib")
+
+
+def test_cooldowns_are_read_from_action_responses():
+    scheduler = Scheduler(VirtualClock())
+
+    scheduler.update_from_response("Samriel", {"data": {"cooldown": {"total_seconds": 30, "remaining_seconds": 12}}})
+    scheduler.update_from_response("Miriel", {"error": {"code": 499}})
+
+    assert scheduler.ready_in("Samriel") == 12
+    assert scheduler.is_ready("Miriel")
+
+
+def test_cooldown_expiration_of_character_data():
+    clock = VirtualClock(start=1_000_000)
+    scheduler = Scheduler(clock)
+    expiration = datetime.fromtimestamp(clock.time() + 20, timezone.utc).isoformat().replace("+00:00", "Z")
+
+    scheduler.update_from_character({"name": "Samriel", "cooldown_expiration": expiration})
+    scheduler.update_from_character({"name": "Miriel", "cooldown_expiration": None})
+
+    assert abs(scheduler.ready_in("Samriel") - 20) < 1e-6
+    assert scheduler.is_ready("Miriel")
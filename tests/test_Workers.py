@@ -0,0 +1,38 @@
+import asyncio
+import importlib
+import socket
+import sys
+
+from CombatSimulator.Fighters import FighterStats
+from CombatSimulator.Workers import CombatJob, CombatWorkerPool
+from api.ArtifactsAPI import ArtifactsAPI
+from mock.MockServer import FIXTURE, MockServer, load_catalog
+from mock.Simulation import serve_in_thread
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("localhost", 0))
+        return probe.getsockname()[1]
+
+
+def test_spawned_workers_do_not_build_their_own_client(tmp_path, monkeypatch):
+    server = MockServer(load_catalog(FIXTURE))
+    port = free_port()
+    serve_in_thread(server, port=port)
+    # inherited by the workers, so a client built there would show up on this server too
+    monkeypatch.setenv("API_ROOT_URL", f"http://localhost:{port}")
+    client = ArtifactsAPI._Singleton__cls(catalog_cache_path=str(tmp_path / "catalog.pickle"))
+    assert server.stats()["by_endpoint"]["/"] == 1
+
+    # spawned workers re-run the parent's __main__, make that main.py as in a real run
+    monkeypatch.setitem(sys.modules, "__main__", importlib.import_module("main"))
+    pool = CombatWorkerPool.from_client(client, processes=2)
+    character = FighterStats(hp=200, attack=(0, 0, 0, 20), damage=(0, 0, 0, 0), resistance=(0, 0, 0, 0))
+    try:
+        results = asyncio.run(pool.evaluate([CombatJob(character, "chicken")] * 8))
+    finally:
+        pool.executor.shutdown(wait=True)
+
+    assert len(results) == 8 and results[0]["all_wins"]
+    assert server.stats()["by_endpoint"]["/"] == 1
@@ -1,6 +1,4 @@
-import asyncio
 import os
-import sys
 from dataclasses import dataclass
 from enum import Enum
 from functools import wraps
@@ -9,39 +7,62 @@ from functools import wraps
 def task(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        with open(f"logs/{args[1]}.log", "a", encoding="utf-8") as logfile:
-            logfile.write(
-                f'    {" ".join((
-                    func.__name__,
-                    *list(map(str, args[1:])),
-                    *([f'{key}: {value}' for key, value in kwargs.items()] if kwargs else [""])
-                ))}'
+        client, name = args[0], args[1]
+        call = " ".join((
+            func.__name__,
+            *list(map(str, args[1:])),
+            *([f'{key}: {value}' for key, value in kwargs.items()] if kwargs else [""])
+        ))
+
+        def record(code, result, started):
+            cooldown = client.scheduler.ready_in(name)
+            client.events.action(
+                name, func.__name__, latency=client.clock.monotonic() - started, cooldown=cooldown,
+                code=code, message=f"    {call}    {result}"
             )
-            data = func(*args, **kwargs).json()
-            while "error" in data:
-                err_code = data["error"]["code"]
-                match err_code:
-                    case 490:
-                        f"    {args[1]} already on the spot"
-                        return data
-                    case 499:
-                        time_to_sleep = int("".join(ch for ch in data["error"]["message"] if ch.isnumeric()))
-                        logfile.write(f"    {args[1]} in calldown, napping for {time_to_sleep} seconds\n")
-                        await asyncio.sleep(time_to_sleep)
-                    case 478:
-                        logfile.write(f"    {args[1]} !!!! insufficient resources for craft\n")
-                        return data
-                    case 497:
-                        logfile.write(f"    {args[1]} !!!! inventory is full\n")
-                        return data
-                    case _:
-                        logfile.write(str(data) + '\n')
-                        return data
-                data = func(*args, **kwargs).json()
-            else:
-                sleep_time = data["data"]["cooldown"]["total_seconds"]
-                logfile.write(f"    Success, {args[1]} is napping for {sleep_time} seconds\n")
-                await asyncio.sleep(sleep_time)
+            client.metrics.record_action(name, func.__name__, code, waited, cooldown, retry=retry)
+
+        retry = False
+        waited = client.clock.monotonic()
+        await client.scheduler.wait_ready(name)
+        started = client.clock.monotonic()
+        waited = started - waited
+        data = await func(*args, **kwargs)
+        while "error" in data:
+            err_code = data["error"]["code"]
+            match err_code:
+                case 490:
+                    record(err_code, f"{args[1]} already on the spot", started)
+                    return data
+                case 499:
+                    # our cooldown view drifted, take the real one from the server
+                    await client.get_characters_data(name, refresh=True)
+                    if client.scheduler.is_ready(name):
+                        client.scheduler.set_cooldown(name, 1)
+                    record(err_code, f"{args[1]} in calldown for {client.scheduler.ready_in(name):.1f} seconds", started)
+                    retry = True
+                    waited = client.clock.monotonic()
+                    await client.scheduler.wait_ready(name)
+                    waited = client.clock.monotonic() - waited
+                case 478:
+                    client.characters.invalidate(name)
+                    record(err_code, f"{args[1]} !!!! insufficient resources for craft", started)
+                    return data
+                case 497:
+                    client.characters.invalidate(name)
+                    record(err_code, f"{args[1]} !!!! inventory is full", started)
+                    return data
+                case _:
+                    client.characters.invalidate(name)
+                    record(err_code, str(data), started)
+                    return data
+            started = client.clock.monotonic()
+            data = await func(*args, **kwargs)
+        else:
+            client.characters.update_from_response(data)
+            client.scheduler.update_from_response(name, data)
+            record(200, f"Success, {args[1]} is cooling down for {client.scheduler.ready_in(name):.1f} seconds", started)
+            client.metrics.record_gains(name, data["data"])
         return data
 
     return wrapper
@@ -49,8 +70,17 @@ def task(func):
 
 class Slots(Enum):
     WEAPON = "weapon"
+    SHIELD = "shield"
+    HELMET = "helmet"
+    BODY_ARMOR = "body_armor"
+    LEG_ARMOR = "leg_armor"
+    BOOTS = "boots"
     RING_1 = "ring1"
     RING_2 = "ring2"
+    AMULET = "amulet"
+    ARTIFACT_1 = "artifact1"
+    ARTIFACT_2 = "artifact2"
+    ARTIFACT_3 = "artifact3"
 
 
 class Locations(Enum):
@@ -104,17 +134,13 @@ skill_to_location = {
 
 def clear_logs():
     logs_dir = "./logs"
-    if os.path.exists(logs_dir):
-        for filename in os.listdir(logs_dir):
-            file_path = os.path.join(logs_dir, filename)
-            try:
-                os.unlink(file_path)
-            except Exception as e:
-                print(f'Could not remove {file_path}. Error: {e}')
-                sys.exit()
-    else:
-        print(f'Directory {logs_dir} does not exist')
-        sys.exit()
+    os.makedirs(logs_dir, exist_ok=True)
+    for filename in os.listdir(logs_dir):
+        file_path = os.path.join(logs_dir, filename)
+        try:
+            os.unlink(file_path)
+        except OSError as e:
+            print(f'Could not remove {file_path}. Error: {e}')
 
 
 @dataclass